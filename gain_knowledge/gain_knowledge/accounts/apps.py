@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gain_knowledge.accounts'
+
+    def ready(self):
+        import gain_knowledge.accounts.signals
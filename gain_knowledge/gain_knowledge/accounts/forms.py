@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth import forms as auth_forms, get_user_model
 
-from gain_knowledge.accounts.models import Profile, CurrentResult
+from gain_knowledge.accounts.models import Profile
 from gain_knowledge.common.helper import BootstrapFormMixin
 from gain_knowledge.main.models import Test
 from django.contrib.auth.forms import PasswordChangeForm, AuthenticationForm
@@ -38,15 +38,8 @@ class CreateProfileForm(BootstrapFormMixin, auth_forms.UserCreationForm):
             user=user,
         )
 
-        current_result = CurrentResult(
-            correct_answers=0,
-            incorrect_answers=0,
-            user=user,
-        )
-
         if commit:
             profile.save()
-            current_result.save()
         return user
 
     class Meta:
@@ -0,0 +1,16 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_currentresult'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='CurrentResult',
+        ),
+    ]
@@ -86,15 +86,3 @@ class Profile(models.Model):
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
-
-
-class CurrentResult(models.Model):
-    user = models.OneToOneField(
-        GainKnowledgeUser,
-        on_delete=models.CASCADE,
-        primary_key=True,
-    )
-
-    correct_answers = models.IntegerField()
-
-    incorrect_answers = models.IntegerField()
\ No newline at end of file
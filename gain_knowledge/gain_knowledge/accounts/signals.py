@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, pre_save, post_init, post_delete
+from django.dispatch import receiver
+
+from gain_knowledge.accounts.models import Profile
+from gain_knowledge.common.images import track_new_images, generate_new_image_derivatives
+from gain_knowledge.main.blobs import track_blob_references, update_blob_references, release_blob_references
+
+
+@receiver(pre_save, sender=Profile)
+def track_new_profile_images(sender, instance, **kwargs):
+    track_new_images(instance)
+
+
+@receiver(post_save, sender=Profile)
+def generate_profile_image_derivatives(sender, instance, **kwargs):
+    generate_new_image_derivatives(instance)
+
+
+@receiver(post_init, sender=Profile)
+def track_profile_blobs(sender, instance, **kwargs):
+    track_blob_references(instance)
+
+
+@receiver(post_save, sender=Profile)
+def update_profile_blobs(sender, instance, created, **kwargs):
+    update_blob_references(instance, created)
+
+
+@receiver(post_delete, sender=Profile)
+def release_profile_blobs(sender, instance, **kwargs):
+    release_blob_references(instance)
@@ -4,7 +4,7 @@ from django.contrib.auth import views as auth_views, logout
 from django.urls import reverse_lazy
 
 from gain_knowledge.accounts.forms import CreateProfileForm, EditProfileForm, ChangePasswordForm, LoginForm
-from gain_knowledge.accounts.models import Profile, GainKnowledgeUser, CurrentResult
+from gain_knowledge.accounts.models import Profile, GainKnowledgeUser
 
 
 class UserLoginView(auth_views.LoginView):
@@ -84,10 +84,8 @@ class DeleteProfileView(views.DeleteView):
         success_url = self.get_success_url()
 
         user = GainKnowledgeUser.objects.filter(id=self.object.user_id)
-        current_result = CurrentResult.objects.filter(user_id=self.object.user_id)
         self.object.delete()
         user.delete()
-        current_result.delete()
 
         return HttpResponseRedirect(success_url)
 
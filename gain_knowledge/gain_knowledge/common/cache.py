@@ -0,0 +1,57 @@
+from django.core.cache import cache
+
+VERSION_KEY_TEMPLATE = 'cache_version_{}'
+HITS_KEY = 'response_cache_hits'
+MISSES_KEY = 'response_cache_misses'
+
+
+def version_key(model):
+    return VERSION_KEY_TEMPLATE.format(model._meta.label_lower)
+
+
+def get_versions(models):
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: 1 for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {model._meta.model_name: versions[key] for model, key in zip(models, keys)}
+
+
+def bump_version(model):
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.set(version_key(model), 2, None)
+
+
+def increment_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def record_hit():
+    increment_counter(HITS_KEY)
+
+
+def record_miss():
+    increment_counter(MISSES_KEY)
+
+
+def get_stats():
+    counters = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0,
+    }
+
+
+def reset_stats():
+    cache.delete_many((HITS_KEY, MISSES_KEY))
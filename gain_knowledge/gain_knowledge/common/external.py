@@ -0,0 +1,22 @@
+import shutil
+import subprocess
+
+ERROR_OUTPUT_MAX_LENGTH = 2000
+
+
+class ExternalCommandError(Exception):
+    pass
+
+
+def find_binary(name):
+    path = shutil.which(name)
+    if path is None:
+        raise ExternalCommandError(f'{name} binary was not found')
+    return path
+
+
+def run(arguments):
+    result = subprocess.run(arguments, capture_output=True, text=True, errors='replace')
+    if result.returncode != 0:
+        raise ExternalCommandError(result.stderr[-ERROR_OUTPUT_MAX_LENGTH:])
+    return result.stdout
@@ -0,0 +1,110 @@
+import io
+import os
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps
+
+from gain_knowledge.common.storage import replace_file
+from gain_knowledge.jobs.queue import enqueue
+
+DERIVATIVE_WIDTHS = (320, 640, 960)
+DERIVATIVE_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+DERIVATIVE_QUALITY = 80
+
+WIDTH_CACHE_KEY_TEMPLATE = 'image_width_{}'
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def derivative_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}_w{width}.{extension}'
+
+
+def derivative_names(name):
+    return [
+        derivative_name(name, width, extension)
+        for width in DERIVATIVE_WIDTHS
+        for extension, _, _ in DERIVATIVE_FORMATS
+    ]
+
+
+def has_derivatives(field_file):
+    return bool(field_file) and field_file.storage.exists(
+        derivative_name(field_file.name, DERIVATIVE_WIDTHS[-1], DERIVATIVE_FORMATS[0][0])
+    )
+
+
+def width_cache_key(name):
+    return WIDTH_CACHE_KEY_TEMPLATE.format(name)
+
+
+def original_width(field_file):
+    width = cache.get(width_cache_key(field_file.name))
+    if width is None:
+        with field_file.storage.open(field_file.name, 'rb') as file:
+            image = Image.open(file)
+            width, height = image.size
+            if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+                width = height
+        cache.set(width_cache_key(field_file.name), width, None)
+    return width
+
+
+def derivative_widths(field_file):
+    # Derivatives are never upscaled, so widths past the original all hold the same image; keep only the first
+    # of them and label it with the width it really has.
+    width = original_width(field_file)
+    widths = [(x, x) for x in DERIVATIVE_WIDTHS if x < width]
+    larger = next((x for x in DERIVATIVE_WIDTHS if x >= width), None)
+    if larger is not None:
+        widths.append((larger, width))
+    return widths
+
+
+def generate_derivatives(field_file):
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    cache.set(width_cache_key(field_file.name), image.width, None)
+
+    for width in DERIVATIVE_WIDTHS:
+        resized = image.copy()
+        resized.thumbnail((min(width, image.width), image.height))
+        for extension, image_format, _ in DERIVATIVE_FORMATS:
+            converted = resized if image_format == 'WEBP' or resized.mode == 'RGB' else resized.convert('RGB')
+            content = io.BytesIO()
+            converted.save(content, image_format, quality=DERIVATIVE_QUALITY)
+
+            replace_file(storage, derivative_name(field_file.name, width, extension), ContentFile(content.getvalue()))
+
+
+def delete_derivatives(storage, name):
+    cache.delete(width_cache_key(name))
+    for derivative in derivative_names(name):
+        if storage.exists(derivative):
+            storage.delete(derivative)
+
+
+def new_image_fields(instance):
+    return [
+        field.name for field in instance._meta.fields
+        if isinstance(field, models.ImageField)
+        and getattr(instance, field.name)
+        and not getattr(instance, field.name)._committed
+    ]
+
+
+def track_new_images(instance):
+    instance._new_image_fields = new_image_fields(instance)
+
+
+def generate_new_image_derivatives(instance):
+    for field_name in getattr(instance, '_new_image_fields', ()):
+        enqueue('images.generate_derivatives', model=instance._meta.label, pk=instance.pk, field=field_name)
@@ -0,0 +1,121 @@
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.template.base import Template
+
+from gain_knowledge.common.cache import get_stats as get_response_cache_stats
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = defaultdict(int)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        return self.count - len(self.statements)
+
+
+class TemplateTimer:
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+    def measure(self, render, template, context):
+        # Included and extended templates render inside their parent, so only the outermost render is timed
+        self.depth += 1
+        start = perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.duration += perf_counter() - start
+
+
+current_template_timer = ContextVar('current_template_timer', default=None)
+
+
+def install_template_timing():
+    render = Template.render
+    if getattr(render, 'timed', False):
+        return
+
+    @wraps(render)
+    def timed_render(template, context):
+        timer = current_template_timer.get()
+        if timer is None:
+            return render(template, context)
+        return timer.measure(render, template, context)
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class MetricsRegistry:
+    FIELDS = ('queries', 'duplicate_queries', 'db_ms', 'template_ms', 'total_ms')
+    PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.samples = defaultdict(lambda: deque(maxlen=self.window_size))
+        self.lock = threading.Lock()
+
+    def record(self, url_name, **sample):
+        with self.lock:
+            self.samples[url_name].append(tuple(sample[field] for field in self.FIELDS))
+
+    def summary(self):
+        with self.lock:
+            samples = {url_name: list(values) for url_name, values in self.samples.items()}
+
+        result = {}
+        for url_name, values in samples.items():
+            columns = dict(zip(self.FIELDS, zip(*values)))
+            result[url_name] = {
+                'requests': len(values),
+                **{
+                    field: {name: percentile(columns[field], fraction) for name, fraction in self.PERCENTILES}
+                    for field in self.FIELDS
+                },
+            }
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+
+metrics = MetricsRegistry(settings.INSTRUMENTATION_WINDOW_SIZE)
+
+
+@staff_member_required
+def instrumentation_stats(request):
+    return JsonResponse({
+        'views': metrics.summary(),
+        'response_cache': get_response_cache_stats(),
+    })
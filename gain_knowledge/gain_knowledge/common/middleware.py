@@ -0,0 +1,49 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from gain_knowledge.common.instrumentation import QueryCollector, TemplateTimer, current_template_timer, \
+    install_template_timing, metrics
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        install_template_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        template_timer = TemplateTimer()
+        token = current_template_timer.set(template_timer)
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(collector):
+                response = self.get_response(request)
+        finally:
+            current_template_timer.reset(token)
+        total_time = perf_counter() - start
+
+        sample = {
+            'queries': collector.count,
+            'duplicate_queries': collector.duplicates,
+            'db_ms': collector.duration * 1000,
+            'template_ms': template_timer.duration * 1000,
+            'total_ms': total_time * 1000,
+        }
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={sample["db_ms"]:.1f};desc="{sample["queries"]} queries, '
+                f'{sample["duplicate_queries"]} duplicates"',
+                f'tpl;dur={sample["template_ms"]:.1f}',
+                f'total;dur={sample["total_ms"]:.1f}',
+            ))
+
+        resolver_match = request.resolver_match
+        metrics.record(resolver_match.url_name if resolver_match else None, **sample)
+        return response
+
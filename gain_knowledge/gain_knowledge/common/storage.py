@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+BLOB_DIRECTORY = 'blobs'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f'{BLOB_DIRECTORY}/')
+
+
+def blob_name(digest, original_name):
+    _, extension = os.path.splitext(original_name)
+    return f'{BLOB_DIRECTORY}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}'
+
+
+def ensure_directory(storage, name):
+    directory = os.path.dirname(storage.path(name))
+    if storage.directory_permissions_mode is not None:
+        old_umask = os.umask(0)
+        try:
+            os.makedirs(directory, storage.directory_permissions_mode, exist_ok=True)
+        finally:
+            os.umask(old_umask)
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+
+def apply_permissions(storage, name):
+    if storage.file_permissions_mode is not None:
+        os.chmod(storage.path(name), storage.file_permissions_mode)
+
+
+def replace_file(storage, name, content):
+    # Writes next to the target and renames over it, so concurrent writers never see a partial or missing file.
+    ensure_directory(storage, name)
+    directory, base_name = os.path.split(storage.path(name))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=f'.{base_name}.', suffix='.part', delete=False) as file:
+        temporary_path = file.name
+        try:
+            for chunk in content.chunks():
+                file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        except BaseException:
+            file.close()
+            os.remove(temporary_path)
+            raise
+    os.replace(temporary_path, storage.path(name))
+    apply_permissions(storage, name)
+    return name
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        # Files derived from a blob (e.g. image derivatives) keep the name they are given.
+        if is_blob_name(name):
+            return replace_file(self, name, content)
+
+        if hasattr(content, 'temporary_file_path'):
+            return self.__save_temporary_file(name, content.temporary_file_path())
+        return self.__save_stream(name, content)
+
+    def __save_temporary_file(self, name, temporary_path):
+        digest = hashlib.sha256()
+        with open(temporary_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+        target_name = blob_name(digest.hexdigest(), name)
+        if self.exists(target_name):
+            os.remove(temporary_path)
+        else:
+            # The upload may live on another filesystem, so stage it next to the blob before the atomic rename.
+            ensure_directory(self, target_name)
+            staging_path = f'{self.path(target_name)}.{uuid.uuid4().hex}.part'
+            file_move_safe(temporary_path, staging_path)
+            os.replace(staging_path, self.path(target_name))
+            apply_permissions(self, target_name)
+        return target_name
+
+    def __save_stream(self, name, content):
+        os.makedirs(self.path(BLOB_DIRECTORY), exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=self.path(BLOB_DIRECTORY), suffix='.part', delete=False) as file:
+            temporary_path = file.name
+            try:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    file.write(chunk)
+            except BaseException:
+                file.close()
+                os.remove(temporary_path)
+                raise
+
+        target_name = blob_name(digest.hexdigest(), name)
+        if self.exists(target_name):
+            os.remove(temporary_path)
+        else:
+            ensure_directory(self, target_name)
+            os.replace(temporary_path, self.path(target_name))
+            apply_permissions(self, target_name)
+        return target_name
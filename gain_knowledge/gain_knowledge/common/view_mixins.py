@@ -1,4 +1,12 @@
-from django.shortcuts import redirect
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import redirect, get_object_or_404
+
+from gain_knowledge.common.cache import get_versions, record_hit, record_miss
 
 
 class RedirectToCategories:
@@ -7,3 +15,141 @@ class RedirectToCategories:
             return redirect('list categories')
 
         return super().dispatch(request, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+    cache_dependencies = ()
+
+    def get_cache_versions(self):
+        if not hasattr(self, '_cache_versions'):
+            self._cache_versions = get_versions(self.cache_dependencies)
+        return self._cache_versions
+
+    def get_response_cache_key(self):
+        path_hash = md5(self.request.get_full_path().encode()).hexdigest()
+        versions = '.'.join(str(x) for x in self.get_cache_versions().values())
+        return f'view_response:{self.request.user.pk}:{path_hash}:{versions}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        cache_key = self.get_response_cache_key()
+        response = cache.get(cache_key)
+        if response is not None:
+            record_hit()
+            return response
+
+        record_miss()
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(lambda r: cache.set(cache_key, r, self.cache_timeout))
+            else:
+                cache.set(cache_key, response, self.cache_timeout)
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cache_versions'] = self.get_cache_versions()
+        context['cache_timeout'] = self.cache_timeout
+        return context
+
+
+class FieldProjectionMixin:
+    only_fields = None
+    defer_fields = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.only_fields is not None:
+            queryset = queryset.only(*self.only_fields)
+        if self.defer_fields is not None:
+            queryset = queryset.defer(*self.defer_fields)
+        return queryset
+
+
+class KeysetPaginationMixin:
+    paginate_by = 20
+    keyset_field = 'pk'
+    after_cursor_param = 'after'
+    before_cursor_param = 'before'
+
+    def get_cursor(self, param):
+        value = self.request.GET.get(param)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise Http404
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.get_cursor(self.after_cursor_param)
+        before = self.get_cursor(self.before_cursor_param)
+        field = self.keyset_field
+
+        if before is not None:
+            object_list = list(queryset.filter(**{f'{field}__lt': before}).order_by(f'-{field}')[:page_size + 1])
+            has_previous = len(object_list) > page_size
+            object_list = object_list[:page_size][::-1]
+            has_next = True
+        else:
+            if after is not None:
+                queryset = queryset.filter(**{f'{field}__gt': after})
+            object_list = list(queryset.order_by(field)[:page_size + 1])
+            has_next = len(object_list) > page_size
+            object_list = object_list[:page_size]
+            has_previous = after is not None
+
+        self.next_cursor = getattr(object_list[-1], field) if has_next and object_list else None
+        self.previous_cursor = getattr(object_list[0], field) if has_previous and object_list else None
+
+        return None, None, object_list, has_next or has_previous
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = getattr(self, 'next_cursor', None)
+        context['previous_cursor'] = getattr(self, 'previous_cursor', None)
+        return context
+
+
+class OwnerRequiredMixin:
+    owned_model = None
+    owned_object_select_related = ()
+    owned_object_context_name = None
+    owned_object_url_kwarg = 'pk'
+    owner_id_path = 'user_id'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def get_owned_object(self):
+        if not hasattr(self, '_owned_object'):
+            queryset = self.owned_model._default_manager.select_related(*self.owned_object_select_related)
+            self._owned_object = get_object_or_404(queryset, pk=self.kwargs[self.owned_object_url_kwarg])
+        return self._owned_object
+
+    def get_owner_id(self):
+        value = self.get_owned_object()
+        for attribute in self.owner_id_path.split('.'):
+            value = getattr(value, attribute)
+        return value
+
+    @property
+    def is_owner(self):
+        return self.get_owner_id() == self.request.user.id
+
+    def get_object(self, queryset=None):
+        return self.get_owned_object()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in self.safe_methods and not self.is_owner:
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.owned_object_context_name:
+            context[self.owned_object_context_name] = self.get_owned_object()
+        context['is_owner'] = self.is_owner
+        return context
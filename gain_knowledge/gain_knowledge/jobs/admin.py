@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from gain_knowledge.jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_after', 'updated_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'updated_at', 'last_error')
+    actions = ('retry_jobs',)
+
+    @admin.action(description='Retry selected jobs')
+    def retry_jobs(self, request, queryset):
+        queryset.update(status=Job.PENDING, attempts=0, run_after=timezone.now())
@@ -0,0 +1,57 @@
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import django
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connections
+
+from gain_knowledge.jobs.models import Job
+from gain_knowledge.jobs.queue import claim_jobs, run_job
+
+
+def initialize_worker():
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOBS_WORKER_PROCESSES)
+        parser.add_argument('--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL_SECONDS)
+        parser.add_argument('--once', action='store_true', help='Exit when no jobs are ready')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        connections.close_all()
+        running = {}
+        with ProcessPoolExecutor(max_workers=processes, initializer=initialize_worker) as executor:
+            while True:
+                free_slots = processes - len(running)
+                for job_id in claim_jobs(free_slots) if free_slots else ():
+                    running[executor.submit(run_job, job_id)] = job_id
+
+                if not running:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.finish_job(running.pop(future), future)
+
+    def finish_job(self, job_id, future):
+        try:
+            status = future.result()
+        except Exception as error:
+            # The worker process itself failed, so run_job had no chance to record the error
+            self.stderr.write(f'Job {job_id}: {error!r}')
+            job = Job.objects.filter(pk=job_id, status=Job.RUNNING).first()
+            if job is not None:
+                job.mark_failed(''.join(traceback.format_exception(type(error), error, error.__traceback__)))
+        else:
+            self.stdout.write(f'Job {job_id}: {status}')
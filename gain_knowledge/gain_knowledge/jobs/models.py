@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    NAME_MAX_LENGTH = 100
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    STATUSES = [(x, x) for x in (PENDING, RUNNING, SUCCEEDED, FAILED)]
+
+    name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+    )
+
+    payload = models.JSONField(
+        default=dict,
+    )
+
+    status = models.CharField(
+        max_length=max(len(x) for x, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING,
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+
+    max_attempts = models.PositiveIntegerField(
+        default=settings.JOBS_MAX_ATTEMPTS,
+    )
+
+    run_after = models.DateTimeField(
+        default=timezone.now,
+    )
+
+    last_error = models.TextField(
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def mark_succeeded(self):
+        self.status = self.SUCCEEDED
+        self.last_error = ''
+        self.save(update_fields=('status', 'last_error', 'updated_at'))
+
+    def mark_failed(self, error):
+        self.last_error = error
+        if self.attempts >= self.max_attempts:
+            self.status = self.FAILED
+        else:
+            self.status = self.PENDING
+            backoff = settings.JOBS_BACKOFF_SECONDS * 2 ** (self.attempts - 1)
+            self.run_after = timezone.now() + timedelta(seconds=backoff)
+        self.save(update_fields=('status', 'last_error', 'run_after', 'updated_at'))
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'run_after'), name='job_status_run_after_idx'),
+        )
@@ -0,0 +1,81 @@
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from gain_knowledge.jobs.models import Job
+
+handlers = {}
+
+
+def register(name):
+    def decorator(handler):
+        handlers[name] = handler
+        return handler
+    return decorator
+
+
+def enqueue(name, **payload):
+    if name not in handlers:
+        raise ValueError(f'No job handler registered for {name}')
+    return Job.objects.create(name=name, payload=payload)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.JOBS_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.PENDING, run_after__lte=now)
+                | Q(status=Job.RUNNING, updated_at__lt=stale_before)
+            )
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        Job.objects.filter(id__in=job_ids).update(status=Job.RUNNING, attempts=F('attempts') + 1, updated_at=now)
+    return job_ids
+
+
+class Heartbeat:
+    # Keeps updated_at fresh while a job runs, so claim_jobs only reclaims jobs whose worker has died.
+    def __init__(self, job_id, interval=None):
+        self.job_id = job_id
+        self.interval = interval or settings.JOBS_HEARTBEAT_SECONDS
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+    def beat(self):
+        beaten = False
+        try:
+            while not self.stopped.wait(self.interval):
+                Job.objects.filter(pk=self.job_id, status=Job.RUNNING).update(updated_at=timezone.now())
+                beaten = True
+        finally:
+            if beaten:
+                connections.close_all()
+
+
+def run_job(job_id):
+    job = Job.objects.get(pk=job_id)
+    with Heartbeat(job_id):
+        try:
+            handlers[job.name](**job.payload)
+        except Exception:
+            job.mark_failed(traceback.format_exc())
+        else:
+            job.mark_succeeded()
+    return job.status
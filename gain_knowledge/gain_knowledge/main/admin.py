@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 # Register your models here.
-from gain_knowledge.main.models import Category, Course, Test, Question
+from gain_knowledge.main.models import Category, Course, Test, Question, TestAttempt, AnswerRecord
 
 
 @admin.register(Category)
@@ -21,4 +21,14 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Question)
 class CategoryAdmin(admin.ModelAdmin):
-    pass
\ No newline at end of file
+    pass
+
+
+@admin.register(TestAttempt)
+class TestAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'test', 'correct_answers', 'incorrect_answers', 'score', 'started_at', 'finished_at')
+
+
+@admin.register(AnswerRecord)
+class AnswerRecordAdmin(admin.ModelAdmin):
+    list_display = ('attempt', 'question', 'answer', 'is_correct')
@@ -0,0 +1,130 @@
+from collections import namedtuple
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from gain_knowledge.jobs.models import Job
+from gain_knowledge.jobs.queue import enqueue
+from gain_knowledge.main.models import AnswerRecord, Question, QuestionStatistics
+
+CHUNK_SIZE = 10000
+BATCH_SIZE = 1000
+GROUP_FRACTION = 0.27
+FIRST_OPTION_CODE = ord(Question.FIRST_OPTION)
+OPTIONS_COUNT = len(Question.OPTIONS)
+
+JOB_NAME = 'analytics.question_statistics'
+
+Answers = namedtuple('Answers', ('attempt', 'test', 'question', 'option', 'correct'))
+
+
+def iter_answer_chunks(chunk_size=CHUNK_SIZE):
+    records = AnswerRecord.objects.filter(attempt__finished_at__isnull=False).order_by('id') \
+        .values_list('id', 'attempt_id', 'attempt__test_id', 'question_id', 'answer', 'is_correct')
+    last_id = 0
+    while True:
+        rows = list(records.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        _, attempt_ids, test_ids, question_ids, answers, is_correct = zip(*rows)
+        yield Answers(
+            np.array(attempt_ids, dtype=np.int64),
+            np.array(test_ids, dtype=np.int64),
+            np.array(question_ids, dtype=np.int64),
+            np.frombuffer(''.join(answers).encode('ascii'), dtype=np.uint8).astype(np.int64) - FIRST_OPTION_CODE,
+            np.array(is_correct, dtype=bool),
+        )
+
+
+def load_answers(chunk_size=CHUNK_SIZE):
+    chunks = list(iter_answer_chunks(chunk_size))
+    if not chunks:
+        return None
+    return Answers(*(np.concatenate(column) for column in zip(*chunks)))
+
+
+def score_groups(attempt_index, answers):
+    attempts_count = attempt_index.max() + 1
+    scores = np.bincount(attempt_index, weights=answers.correct, minlength=attempts_count) \
+        / np.bincount(attempt_index, minlength=attempts_count)
+    tests = np.empty(attempts_count, dtype=np.int64)
+    tests[attempt_index] = answers.test
+
+    order = np.lexsort((scores, tests))
+    sorted_tests = tests[order]
+    starts = np.searchsorted(sorted_tests, sorted_tests, side='left')
+    sizes = np.searchsorted(sorted_tests, sorted_tests, side='right') - starts
+    ranks = np.arange(attempts_count) - starts
+    group_sizes = np.ceil(sizes * GROUP_FRACTION).astype(np.int64)
+
+    lower = np.zeros(attempts_count, dtype=bool)
+    upper = np.zeros(attempts_count, dtype=bool)
+    lower[order] = (sizes > 1) & (ranks < group_sizes)
+    upper[order] = (sizes > 1) & (ranks >= sizes - group_sizes)
+    return lower, upper
+
+
+def group_p_values(question_index, questions_count, correct, group):
+    responses = np.bincount(question_index, weights=group, minlength=questions_count)
+    correct_responses = np.bincount(question_index, weights=group & correct, minlength=questions_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(responses > 0, correct_responses / responses, np.nan)
+
+
+def compute_statistics(answers):
+    question_ids, question_index = np.unique(answers.question, return_inverse=True)
+    _, attempt_index = np.unique(answers.attempt, return_inverse=True)
+    questions_count = len(question_ids)
+
+    responses = np.bincount(question_index, minlength=questions_count)
+    p_values = np.bincount(question_index, weights=answers.correct, minlength=questions_count) / responses
+    option_rates = np.bincount(
+        question_index * OPTIONS_COUNT + answers.option, minlength=questions_count * OPTIONS_COUNT,
+    ).reshape(questions_count, OPTIONS_COUNT) / responses[:, None]
+
+    lower, upper = score_groups(attempt_index, answers)
+    discrimination = group_p_values(question_index, questions_count, answers.correct, upper[attempt_index]) \
+        - group_p_values(question_index, questions_count, answers.correct, lower[attempt_index])
+
+    return question_ids, responses, p_values, discrimination, option_rates
+
+
+def store_statistics(question_ids, responses, p_values, discrimination, option_rates):
+    computed_at = timezone.now()
+    with transaction.atomic():
+        existing = set(Question.objects.filter(id__in=question_ids.tolist()).values_list('id', flat=True))
+        QuestionStatistics.objects.all().delete()
+        QuestionStatistics.objects.bulk_create(
+            (
+                QuestionStatistics(
+                    question_id=question_id,
+                    response_count=response_count,
+                    p_value=p_value,
+                    discrimination=None if np.isnan(index) else index,
+                    computed_at=computed_at,
+                    **dict(zip(QuestionStatistics.OPTION_RATE_FIELDS, rates)),
+                )
+                for question_id, response_count, p_value, index, rates in zip(
+                    question_ids.tolist(), responses.tolist(), p_values.tolist(), discrimination.tolist(),
+                    option_rates.tolist())
+                if question_id in existing
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    return len(existing)
+
+
+def compute_question_statistics(chunk_size=CHUNK_SIZE):
+    answers = load_answers(chunk_size)
+    if answers is None:
+        QuestionStatistics.objects.all().delete()
+        return 0
+    return store_statistics(*compute_statistics(answers))
+
+
+def enqueue_question_statistics():
+    if Job.objects.filter(name=JOB_NAME, status=Job.PENDING).exists():
+        return None
+    return enqueue(JOB_NAME)
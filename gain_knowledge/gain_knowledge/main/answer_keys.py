@@ -0,0 +1,53 @@
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from gain_knowledge.main.models import Question
+
+
+class AnswerKey:
+    CACHE_KEY_TEMPLATE = 'answer_key_{}'
+
+    def __init__(self, question_ids, codes):
+        self.question_ids = question_ids
+        self.codes = codes
+
+    @classmethod
+    def cache_key(cls, test_id):
+        return cls.CACHE_KEY_TEMPLATE.format(test_id)
+
+    @classmethod
+    def build(cls, test_id):
+        question_ids = array('q')
+        codes = []
+        for question_id, correct_answer in Question.objects.filter(test_id=test_id).order_by('id') \
+                .values_list('id', 'correct_answer'):
+            question_ids.append(question_id)
+            codes.append(correct_answer)
+        return cls(question_ids, ''.join(codes))
+
+    @classmethod
+    def for_test(cls, test_id):
+        cached = cache.get(cls.cache_key(test_id))
+        if cached is not None:
+            return cls(*cached)
+        answer_key = cls.build(test_id)
+        cache.set(cls.cache_key(test_id), (answer_key.question_ids, answer_key.codes), None)
+        return answer_key
+
+    @classmethod
+    def invalidate(cls, test_id):
+        cache.delete(cls.cache_key(test_id))
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def correct_answer(self, question_id):
+        index = bisect_left(self.question_ids, question_id)
+        if index < len(self.question_ids) and self.question_ids[index] == question_id:
+            return self.codes[index]
+        return None
+
+    def grade(self, question_id, answer):
+        return self.correct_answer(question_id) == answer
@@ -0,0 +1,69 @@
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import F
+
+from gain_knowledge.common.images import delete_derivatives
+from gain_knowledge.common.storage import is_blob_name
+from gain_knowledge.main.documents import delete_preview
+from gain_knowledge.main.models import MediaBlob
+from gain_knowledge.main.transcoding import delete_renditions
+
+DEDUPLICATED_MODELS = ('main.Category', 'main.Course', 'accounts.Profile')
+
+
+def file_field_names(instance):
+    names = {}
+    for field in instance._meta.fields:
+        if isinstance(field, models.FileField) and field.attname in instance.__dict__:
+            value = instance.__dict__[field.attname]
+            names[field.attname] = getattr(value, 'name', value) or ''
+    return names
+
+
+def acquire(name):
+    if not is_blob_name(name):
+        return
+    _, created = MediaBlob.objects.get_or_create(name=name, defaults={'references': 1})
+    if not created:
+        MediaBlob.objects.filter(name=name).update(references=F('references') + 1)
+
+
+def release(name):
+    if not is_blob_name(name):
+        return
+    with transaction.atomic():
+        MediaBlob.objects.filter(name=name, references__gt=0).update(references=F('references') - 1)
+        orphan = MediaBlob.objects.select_for_update().filter(name=name, references=0).first()
+        if orphan is not None:
+            orphan.delete()
+            transaction.on_commit(lambda: delete_blob(name))
+
+
+def delete_blob(name):
+    if MediaBlob.objects.filter(name=name).exists():
+        return
+    default_storage.delete(name)
+    delete_derivatives(default_storage, name)
+    delete_preview(name)
+    delete_renditions(name)
+
+
+def track_blob_references(instance):
+    instance._blob_names = file_field_names(instance)
+
+
+def update_blob_references(instance, created=False):
+    previous = {} if created else getattr(instance, '_blob_names', {})
+    current = file_field_names(instance)
+    for attname, name in current.items():
+        old_name = previous.get(attname, '')
+        if name != old_name:
+            acquire(name)
+            release(old_name)
+    instance._blob_names = {**previous, **current}
+
+
+def release_blob_references(instance):
+    names = {**getattr(instance, '_blob_names', {}), **file_field_names(instance)}
+    for name in names.values():
+        release(name)
@@ -0,0 +1,183 @@
+import json
+import os
+import zipfile
+
+from django.core.exceptions import ValidationError, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import Truncator
+
+from gain_knowledge.common.cache import bump_version
+from gain_knowledge.common.storage import is_blob_name
+from gain_knowledge.main import question_bank
+from gain_knowledge.main.models import Course, Test, Question, VideoRendition, MediaBlob
+from gain_knowledge.main.search import index_questions
+
+ARCHIVE_VERSION = 1
+MANIFEST_NAME = 'course.json'
+MEDIA_DIRECTORY = 'media'
+MEDIA_FIELDS = ('picture', 'video', 'document')
+COURSE_FIELDS = ('title', 'description')
+TEST_FIELDS = ('title', 'question_count', 'shuffle_options')
+QUESTION_FIELDS = ('title', 'first_option', 'second_option', 'third_option', 'fourth_option', 'correct_answer')
+BATCH_SIZE = 1000
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def clone_title(title):
+    return Truncator(f'{title} (copy)').chars(Course.TITLE_MAX_LENGTH)
+
+
+def copy_questions(test_ids, course_id):
+    questions = Question.objects.filter(test_id__in=test_ids).order_by('id').iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for question in questions:
+        question.pk = None
+        question.test_id = test_ids[question.test_id]
+        batch.append(question)
+        if len(batch) >= BATCH_SIZE:
+            index_questions(Question.objects.bulk_create(batch), course_id)
+            batch = []
+    if batch:
+        index_questions(Question.objects.bulk_create(batch), course_id)
+
+
+def clone_course(course, user, title=None):
+    with transaction.atomic():
+        clone = Course.objects.create(
+            title=title or clone_title(course.title),
+            description=course.description,
+            category_id=course.category_id,
+            picture=course.picture.name,
+            video=course.video.name,
+            document=course.document.name,
+            user=user,
+        )
+
+        VideoRendition.objects.bulk_create(
+            VideoRendition(course=clone, kind=x.kind, height=x.height, bitrate_kbps=x.bitrate_kbps, file=x.file.name)
+            for x in course.renditions.all()
+        )
+
+        tests = list(Test.objects.filter(course=course).order_by('id'))
+        clones = Test.objects.bulk_create(
+            Test(course=clone, **{field: getattr(x, field) for field in TEST_FIELDS}) for x in tests)
+        copy_questions({test.id: test_clone.id for test, test_clone in zip(tests, clones)}, clone.id)
+
+        transaction.on_commit(lambda: bump_version(Test))
+    return clone
+
+
+def build_manifest(course, include_media):
+    tests = []
+    for test in Test.objects.filter(course=course).order_by('id'):
+        questions = Question.objects.filter(test=test).order_by('position').values_list(*QUESTION_FIELDS)
+        tests.append({
+            **{field: getattr(test, field) for field in TEST_FIELDS},
+            'questions': [list(x) for x in questions.iterator(chunk_size=BATCH_SIZE)],
+        })
+
+    return {
+        'version': ARCHIVE_VERSION,
+        'course': {field: getattr(course, field) for field in COURSE_FIELDS},
+        'category': course.category.title,
+        'media': {
+            field: {
+                'name': getattr(course, field).name,
+                'archived': include_media,
+            }
+            for field in MEDIA_FIELDS
+        },
+        'question_fields': QUESTION_FIELDS,
+        'tests': tests,
+    }
+
+
+def archived_media_name(field, name):
+    return f'{MEDIA_DIRECTORY}/{field}{os.path.splitext(name)[1]}'
+
+
+def export_course(course, file, include_media=True):
+    manifest = build_manifest(course, include_media)
+    with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+        if include_media:
+            for field in MEDIA_FIELDS:
+                field_file = getattr(course, field)
+                with field_file.open('rb') as source, \
+                        archive.open(archived_media_name(field, field_file.name), 'w', force_zip64=True) as target:
+                    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                        target.write(chunk)
+
+
+def read_manifest(archive):
+    try:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    except (KeyError, ValueError):
+        raise ArchiveError('The archive does not contain a valid course manifest')
+    if not isinstance(manifest, dict):
+        raise ArchiveError('The archive does not contain a valid course manifest')
+    if manifest.get('version') != ARCHIVE_VERSION:
+        raise ArchiveError(f"Unsupported archive version: {manifest.get('version')}")
+    return manifest
+
+
+def restore_media(archive, field, media):
+    if not media['archived']:
+        if not default_storage.exists(media['name']):
+            raise ArchiveError(f'The {field} file is not in the archive or in the media storage')
+        return media['name']
+
+    upload_to = Course._meta.get_field(field).upload_to
+    with archive.open(archived_media_name(field, media['name'])) as source:
+        return default_storage.save(f'{upload_to}/{os.path.basename(media["name"])}', source)
+
+
+def import_course(file, user, category):
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ArchiveError('The file is not a course archive')
+
+    restored_names = []
+    try:
+        with archive, transaction.atomic():
+            manifest = read_manifest(archive)
+            course = Course(user=user, category=category, **{
+                field: manifest['course'][field] for field in COURSE_FIELDS
+            })
+            for field in MEDIA_FIELDS:
+                name = restore_media(archive, field, manifest['media'][field])
+                restored_names.append(name)
+                setattr(course, field, name)
+            course.full_clean(exclude=MEDIA_FIELDS)
+            course.save()
+
+            fields = manifest['question_fields']
+            for test_data in manifest['tests']:
+                test = Test(course=course, **{field: test_data[field] for field in TEST_FIELDS if field in test_data})
+                test.full_clean()
+                test.save()
+                result = question_bank.import_questions(
+                    test.id, (dict(zip(fields, row)) for row in test_data['questions']))
+                if result.failed:
+                    raise ArchiveError(f'Invalid questions in test "{test.title}": {result.as_dict()["errors"]}')
+    except ValidationError as error:
+        discard_unreferenced(restored_names)
+        raise ArchiveError('; '.join(error.messages))
+    except (KeyError, TypeError, ValueError, AttributeError, SuspiciousFileOperation, zipfile.BadZipFile) as error:
+        discard_unreferenced(restored_names)
+        raise ArchiveError(f'The course archive is malformed: {error!r}')
+    except Exception:
+        discard_unreferenced(restored_names)
+        raise
+    return course
+
+
+def discard_unreferenced(names):
+    for name in names:
+        if is_blob_name(name) and not MediaBlob.objects.filter(name=name).exists():
+            default_storage.delete(name)
@@ -0,0 +1,121 @@
+import os
+import re
+import tempfile
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from gain_knowledge.common.cache import bump_version
+from gain_knowledge.common.external import find_binary, run
+from gain_knowledge.jobs.queue import enqueue
+from gain_knowledge.main.models import Course, DocumentPreview, DocumentPage
+
+PAGE_COUNT_PATTERN = re.compile(r'^Pages:\s+(\d+)', re.MULTILINE)
+PAGE_SEPARATOR = '\f'
+THUMBNAIL_RESOLUTION = 30
+PAGE_RESOLUTION = 110
+
+
+def thumbnail_name(document_name):
+    root, _ = os.path.splitext(document_name)
+    return f'{root}_thumbnail.png'
+
+
+def read_page_count(source):
+    output = run((find_binary(settings.PDFINFO_BINARY), source))
+    match = PAGE_COUNT_PATTERN.search(output)
+    if match is None:
+        raise ValueError(f'Could not read the page count of {source}')
+    return int(match.group(1))
+
+
+def read_page_texts(source, page_count):
+    output = run((find_binary(settings.PDFTOTEXT_BINARY), '-enc', 'UTF-8', '-layout', source, '-'))
+    texts = output.split(PAGE_SEPARATOR)
+    return [text.strip() for text in texts[:page_count]] + [''] * (page_count - len(texts))
+
+
+def render_page(source, number, resolution, target):
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+        prefix = os.path.join(temporary_directory, 'page')
+        run((
+            find_binary(settings.PDFTOPPM_BINARY), '-png', '-singlefile', '-r', str(resolution),
+            '-f', str(number), '-l', str(number), source, prefix,
+        ))
+        os.replace(f'{prefix}.png', target)
+
+
+def extract_preview(document_name):
+    if DocumentPreview.objects.filter(document=document_name).exists():
+        return
+
+    source = default_storage.path(document_name)
+    page_count = read_page_count(source)
+    texts = read_page_texts(source, page_count)
+    thumbnail = thumbnail_name(document_name)
+    render_page(source, 1, THUMBNAIL_RESOLUTION, default_storage.path(thumbnail))
+
+    with transaction.atomic():
+        preview, created = DocumentPreview.objects.get_or_create(
+            document=document_name,
+            defaults={'page_count': page_count, 'thumbnail': thumbnail},
+        )
+        if created:
+            DocumentPage.objects.bulk_create(
+                DocumentPage(preview=preview, number=number, text=text)
+                for number, text in enumerate(texts, 1)
+            )
+            transaction.on_commit(lambda: bump_version(Course))
+
+
+def enqueue_preview(course):
+    enqueue('documents.extract_preview', document=course.document.name)
+
+
+def delete_preview(document_name):
+    DocumentPreview.objects.filter(document=document_name).delete()
+    default_storage.delete(thumbnail_name(document_name))
+
+
+def page_cache_path(document_name, number):
+    digest = sha1(document_name.encode()).hexdigest()
+    return os.path.join(settings.DOCUMENT_PAGE_CACHE_LOCATION, digest[:2], f'{digest}_{number}.png')
+
+
+def evict_page_cache(location, max_size):
+    entries = []
+    total_size = 0
+    for directory, _, file_names in os.walk(location):
+        for file_name in file_names:
+            path = os.path.join(directory, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+
+def get_page_image(document_name, number):
+    path = page_cache_path(document_name, number)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    render_page(default_storage.path(document_name), number, PAGE_RESOLUTION, path)
+    evict_page_cache(settings.DOCUMENT_PAGE_CACHE_LOCATION, settings.DOCUMENT_PAGE_CACHE_MAX_SIZE)
+    return path
@@ -1,7 +1,7 @@
 from django import forms
 
 from gain_knowledge.common.helper import BootstrapFormMixin
-from gain_knowledge.main.models import Question, Course, Test
+from gain_knowledge.main.models import Question, Course, Test, Category
 
 
 class CreateCourseForm(BootstrapFormMixin, forms.ModelForm):
@@ -24,6 +24,18 @@ class CreateCourseForm(BootstrapFormMixin, forms.ModelForm):
         fields = ('title', 'description', 'picture', 'video', 'document', 'category')
 
 
+class ImportCourseForm(BootstrapFormMixin, forms.Form):
+    archive = forms.FileField()
+
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_bootstrap_form_controls()
+
+
 class CreateTestForm(BootstrapFormMixin, forms.ModelForm):
 
     def __init__(self, course_id, *args, **kwargs):
@@ -43,7 +55,7 @@ class CreateTestForm(BootstrapFormMixin, forms.ModelForm):
 
     class Meta:
         model = Test
-        fields = ('title',)
+        fields = ('title', 'question_count', 'shuffle_options')
 
 
 class CreateQuestionForm(BootstrapFormMixin, forms.ModelForm):
@@ -99,6 +111,55 @@ class CreateQuestionForm(BootstrapFormMixin, forms.ModelForm):
         }
 
 
+class AnswerQuestionForm(forms.Form):
+    answer = forms.ChoiceField(
+        widget=forms.RadioSelect,
+    )
+
+    def __init__(self, step, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['answer'].label = step.title
+        self.fields['answer'].choices = step.options
+
+
+class AnswerTestQuestionForm(AnswerQuestionForm):
+    question = forms.IntegerField(
+        widget=forms.HiddenInput,
+    )
+
+    def __init__(self, step, *args, **kwargs):
+        super().__init__(step, *args, **kwargs)
+        self.step = step
+        self.fields['question'].initial = step.id
+
+    def clean_question(self):
+        question_id = self.cleaned_data['question']
+        if question_id != self.step.id:
+            raise forms.ValidationError('The test has changed since it was opened. Please reload it.')
+        return question_id
+
+
+class BaseAnswerQuestionFormSet(forms.BaseFormSet):
+    def __init__(self, steps, *args, **kwargs):
+        self.steps = steps
+        super().__init__(*args, **kwargs)
+
+    def total_form_count(self):
+        return len(self.steps)
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        kwargs['step'] = self.steps[index]
+        return kwargs
+
+
+AnswerQuestionFormSet = forms.formset_factory(
+    AnswerTestQuestionForm,
+    formset=BaseAnswerQuestionFormSet,
+    extra=0,
+)
+
+
 class CourseEditForm(BootstrapFormMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -116,7 +177,7 @@ class EditTestForm(BootstrapFormMixin, forms.ModelForm):
 
     class Meta:
         model = Test
-        fields = ('title',)
+        fields = ('title', 'question_count', 'shuffle_options')
 
 
 class EditQuestionForm(BootstrapFormMixin, forms.ModelForm):
@@ -0,0 +1,155 @@
+import io
+import json
+import random
+import re
+from datetime import date
+from time import perf_counter
+
+import django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from gain_knowledge.common.instrumentation import percentile
+from gain_knowledge.main.models import Category, Course, Test, Question
+from gain_knowledge.main.search import rebuild_index
+from gain_knowledge.main.seeding import seed_users, seed_catalog, throwaway_database
+
+HIDDEN_INPUT_PATTERN = re.compile(r'<input type="hidden" name="([\w-]+)" value="([^"]*)"')
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database with synthetic data and benchmarks the main user flows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=5000)
+        parser.add_argument('--tests', type=int, default=50)
+        parser.add_argument('--questions-min', type=int, default=10)
+        parser.add_argument('--questions-max', type=int, default=500)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database between runs')
+        parser.add_argument('--output', help='Path of the JSON artifact')
+
+    def handle(self, *args, **options):
+        with throwaway_database(options['keepdb']):
+            report = self.run_benchmarks(options)
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+    def run_benchmarks(self, options):
+        self.rng = random.Random(options['seed'])
+        self.results = {}
+
+        if not Question.objects.exists():
+            users = seed_users(options['users'])
+            seed_catalog(users, options['categories'], options['courses'], options['tests'],
+                         options['questions_min'], options['questions_max'], self.rng)
+            rebuild_index()
+
+        self.client = Client()
+        self.client.force_login(Course.objects.order_by('id').first().user)
+
+        category_ids = list(Category.objects.values_list('id', flat=True))
+        course_ids = list(Course.objects.values_list('id', flat=True))
+        test_ids = list(Test.objects.filter(question__isnull=False).distinct().values_list('id', flat=True))
+
+        for _ in range(options['iterations']):
+            self.measure('list categories', 'get', reverse('list categories'))
+            self.measure('list courses', 'get', reverse('list courses', kwargs={'pk': self.rng.choice(category_ids)}))
+            self.measure('courses details', 'get', reverse('courses details', kwargs={'pk': self.rng.choice(course_ids)}))
+            self.measure('user list courses', 'get', reverse('user list courses'))
+            self.measure('search', 'get', reverse('search'), {'q': f'course {self.rng.choice(course_ids)}'})
+
+        for test_id in test_ids[:options['iterations']]:
+            self.take_quiz(test_id)
+            self.take_single_page_quiz(test_id)
+
+        for number in range(min(options['iterations'], 20)):
+            self.register(number)
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'django_version': django.get_version(),
+            'database_vendor': connection.vendor,
+            'options': {key: options[key] for key in (
+                'categories', 'courses', 'tests', 'questions_min', 'questions_max', 'users', 'iterations', 'seed')},
+            'scenarios': {name: self.summarize(samples) for name, samples in self.results.items()},
+        }
+
+    def measure(self, name, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = getattr(self.client, method)(url, data)
+            elapsed = perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f'{name} returned {response.status_code}')
+        self.results.setdefault(name, []).append((elapsed, len(queries)))
+        return response
+
+    def take_quiz(self, test_id):
+        self.measure('display question (start)', 'get', reverse('display question', kwargs={
+            'pk_test': test_id,
+            'count_questions': 0,
+        }))
+        response = None
+        for count_questions in range(Question.objects.filter(test_id=test_id).count()):
+            response = self.measure('display question (answer)', 'post', reverse('display question', kwargs={
+                'pk_test': test_id,
+                'count_questions': count_questions,
+            }), {'answer': self.rng.choice(Question.OPTIONS)[0]})
+        self.measure('final score', 'get', response['Location'])
+
+    def take_single_page_quiz(self, test_id):
+        url = reverse('display test', kwargs={'pk_test': test_id})
+        response = self.measure('display test (open)', 'get', url)
+        data = dict(HIDDEN_INPUT_PATTERN.findall(response.content.decode()))
+        for x in range(int(data['form-TOTAL_FORMS'])):
+            data[f'form-{x}-answer'] = self.rng.choice(Question.OPTIONS)[0]
+        self.measure('display test (submit)', 'post', url, data)
+
+    def register(self, number):
+        picture = io.BytesIO()
+        Image.new('RGB', (64, 64)).save(picture, 'JPEG')
+        self.measure('register', 'post', reverse('register'), {
+            'username': f'benchmark_{number}_{self.rng.randint(0, 10 ** 9)}',
+            'password1': 'Str0ng-benchmark-password',
+            'password2': 'Str0ng-benchmark-password',
+            'first_name': 'Bench',
+            'last_name': 'Mark',
+            'picture': SimpleUploadedFile('picture.jpg', picture.getvalue(), content_type='image/jpeg'),
+            'date_of_birth': date(1990, 1, 1),
+            'email': 'bench@example.com',
+            'gender': 'Male',
+        })
+
+    @staticmethod
+    def summarize(samples):
+        latencies = [x * 1000 for x, _ in samples]
+        queries = [x for _, x in samples]
+        return {
+            'requests': len(samples),
+            'throughput_rps': len(samples) / sum(latencies) * 1000 if sum(latencies) else 0,
+            'p50_ms': percentile(latencies, 0.5),
+            'p99_ms': percentile(latencies, 0.99),
+            'queries_mean': sum(queries) / len(queries),
+            'queries_max': max(queries),
+        }
+
+    def print_report(self, report):
+        self.stdout.write(f"{'scenario':<28}{'requests':>9}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, summary in report['scenarios'].items():
+            self.stdout.write(
+                f"{name:<28}{summary['requests']:>9}{summary['throughput_rps']:>10.1f}"
+                f"{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['queries_mean']:>9.1f}"
+            )
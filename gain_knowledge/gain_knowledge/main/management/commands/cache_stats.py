@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from gain_knowledge.common.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows the response cache hit and miss counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        self.stdout.write(f"Hits: {stats['hits']}")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Hit ratio: {stats['hit_ratio']:.2%}")
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from gain_knowledge.main.analytics import compute_question_statistics, enqueue_question_statistics, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Computes per-question difficulty, discrimination and option selection rates from all finished attempts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--enqueue', action='store_true', help='Queue a background job instead of running now')
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = enqueue_question_statistics()
+            self.stdout.write(f'Queued job {job.pk}' if job else 'A statistics job is already queued')
+            return
+
+        count = compute_question_statistics(options['chunk_size'])
+        self.stdout.write(f'Questions with statistics: {count}')
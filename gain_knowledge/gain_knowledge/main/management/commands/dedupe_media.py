@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management import BaseCommand
+from django.db import models
+
+from gain_knowledge.common.images import delete_derivatives
+from gain_knowledge.common.storage import is_blob_name
+from gain_knowledge.jobs.queue import enqueue
+from gain_knowledge.main.blobs import DEDUPLICATED_MODELS, acquire
+
+
+class Command(BaseCommand):
+    help = 'Moves existing media files into content-addressed storage and removes the duplicates'
+
+    def handle(self, *args, **options):
+        moved = {}
+        for label in DEDUPLICATED_MODELS:
+            model = apps.get_model(label)
+            for field in model._meta.fields:
+                if isinstance(field, models.FileField):
+                    self.__dedupe_field(model, field, moved)
+
+        for name in moved:
+            default_storage.delete(name)
+            delete_derivatives(default_storage, name)
+
+        self.stdout.write(f'Files moved: {len(moved)}')
+        self.stdout.write(f'Distinct blobs: {len(set(moved.values()))}')
+
+    @staticmethod
+    def __dedupe_field(model, field, moved):
+        rows = model._default_manager.exclude(**{field.name: ''}).values_list('pk', field.attname)
+        for pk, name in rows.iterator():
+            if is_blob_name(name) or not default_storage.exists(name):
+                continue
+            if name not in moved:
+                with default_storage.open(name, 'rb') as file:
+                    moved[name] = default_storage.save(name, file)
+
+            model._default_manager.filter(pk=pk).update(**{field.attname: moved[name]})
+            acquire(moved[name])
+            if isinstance(field, models.ImageField):
+                enqueue('images.generate_derivatives', model=model._meta.label, pk=pk, field=field.name)
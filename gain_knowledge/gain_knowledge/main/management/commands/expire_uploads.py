@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+
+from gain_knowledge.main.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes chunked upload sessions older than CHUNKED_UPLOAD_EXPIRY_SECONDS together with their partial files'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Expired uploads: {expire_uploads()}')
@@ -0,0 +1,121 @@
+import random
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gain_knowledge.main.models import Test, Question
+from gain_knowledge.main.search import rebuild_index
+from gain_knowledge.main.seeding import seed_users, seed_catalog, throwaway_database
+
+POSTGRESQL_SEQUENTIAL_SCAN_PATTERN = re.compile(r'Seq Scan on (\w+)')
+SQLITE_SEQUENTIAL_SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)')
+FILTER_CLAUSE_PATTERN = re.compile(r'\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)', re.DOTALL)
+FILTERED_COLUMN_PATTERN = re.compile(r'"(\w+)"\."\w+"')
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the queries of the main views against seeded data and flags sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--courses', type=int, default=20000)
+        parser.add_argument('--tests', type=int, default=2000)
+        parser.add_argument('--questions-min', type=int, default=5)
+        parser.add_argument('--questions-max', type=int, default=30)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the seeded database between runs')
+        parser.add_argument('--ignore-table', action='append', default=[], help='Do not flag scans of this table')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error when scans are flagged')
+
+    def handle(self, *args, **options):
+        with throwaway_database(options['keepdb']):
+            if not Question.objects.exists():
+                users = seed_users(options['users'])
+                seed_catalog(users, options['categories'], options['courses'], options['tests'],
+                             options['questions_min'], options['questions_max'], random.Random(options['seed']))
+                rebuild_index()
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            flagged = self.explain_views(options)
+
+        self.stdout.write(f'Flagged sequential scans: {len(flagged)}')
+        if flagged and options['fail_on_scan']:
+            raise CommandError('Sequential scans found: ' + ', '.join(sorted({table for _, table, _ in flagged})))
+
+    def get_requests(self):
+        test = Test.objects.filter(question__isnull=False).select_related('course').order_by('id').first()
+        course = test.course
+        return course.user, [
+            ('list categories', reverse('list categories'), None),
+            ('list courses', reverse('list courses', kwargs={'pk': course.category_id}), None),
+            ('courses details', reverse('courses details', kwargs={'pk': course.pk}), None),
+            ('list tests', reverse('list tests', kwargs={'pk': course.pk}), None),
+            ('user list courses', reverse('user list courses'), None),
+            ('user list tests', reverse('user list tests', kwargs={'pk': course.pk}), None),
+            ('user list questions', reverse('user list questions', kwargs={'pk': test.pk}), None),
+            ('display question', reverse('display question', kwargs={'pk_test': test.pk, 'count_questions': 0}), None),
+            ('display test', reverse('display test', kwargs={'pk_test': test.pk}), None),
+            ('search', reverse('search'), {'q': course.title}),
+        ]
+
+    def explain_views(self, options):
+        user, requests = self.get_requests()
+        client = Client()
+        client.force_login(user)
+        ignored_tables = set(options['ignore_table'])
+
+        flagged = []
+        for name, url, data in requests:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, data)
+            if response.status_code >= 400:
+                raise CommandError(f'{name} returned {response.status_code}')
+
+            statements = list(dict.fromkeys(
+                query['sql'] for query in queries.captured_queries if query['sql'].lstrip().upper().startswith('SELECT')
+            ))
+            self.stdout.write(f'{name}: {len(statements)} queries')
+            for sql in statements:
+                plan = self.explain(sql)
+                if options['verbose_plans']:
+                    self.stdout.write(f'  {sql}\n    ' + '\n    '.join(plan))
+                for table in self.sequential_scans(plan, sql):
+                    if table not in ignored_tables:
+                        flagged.append((name, table, sql))
+                        self.stdout.write(self.style.WARNING(f'  sequential scan on {table}: {sql}'))
+        return flagged
+
+    @staticmethod
+    def explain(sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN {sql}')
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    @staticmethod
+    def filtered_tables(sql):
+        return {
+            table
+            for clause in FILTER_CLAUSE_PATTERN.findall(sql)
+            for table in FILTERED_COLUMN_PATTERN.findall(clause)
+        }
+
+    def sequential_scans(self, plan, sql):
+        if connection.vendor == 'postgresql':
+            pattern, tables = POSTGRESQL_SEQUENTIAL_SCAN_PATTERN, None
+        else:
+            # SQLite reports walking a table in rowid order as a plain SCAN, which is only a problem when the
+            # query filters that table.
+            pattern, tables = SQLITE_SEQUENTIAL_SCAN_PATTERN, self.filtered_tables(sql)
+        for line in plan:
+            match = pattern.search(line.strip())
+            if match is not None and (tables is None or match.group(1) in tables):
+                yield match.group(1)
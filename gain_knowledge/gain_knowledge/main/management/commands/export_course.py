@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand, CommandError
+
+from gain_knowledge.main.course_tree import export_course
+from gain_knowledge.main.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Exports a course with its tests, questions and media into a zip archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--without-media', action='store_true',
+                            help='Reference the media files by name instead of archiving them')
+
+    def handle(self, *args, **options):
+        course = Course.objects.select_related('category').filter(pk=options['course_id']).first()
+        if course is None:
+            raise CommandError(f"Course {options['course_id']} does not exist")
+
+        with open(options['path'], 'wb') as file:
+            export_course(course, file, include_media=not options['without_media'])
+        self.stdout.write(f"Exported {course} to {options['path']}")
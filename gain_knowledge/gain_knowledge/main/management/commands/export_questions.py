@@ -0,0 +1,25 @@
+from django.core.management import BaseCommand, CommandError
+
+from gain_knowledge.main import question_bank
+from gain_knowledge.main.models import Test
+
+
+class Command(BaseCommand):
+    help = 'Exports the questions of a test as CSV, JSON or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_id', type=int)
+        parser.add_argument('--format', choices=question_bank.FORMATS, default=question_bank.JSONL)
+        parser.add_argument('--output', help='Defaults to standard output')
+
+    def handle(self, *args, **options):
+        if not Test.objects.filter(pk=options['test_id']).exists():
+            raise CommandError(f"Test {options['test_id']} does not exist")
+
+        chunks = question_bank.export_questions(options['test_id'], options['format'])
+        if options['output'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(chunks)
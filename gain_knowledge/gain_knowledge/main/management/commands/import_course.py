@@ -0,0 +1,47 @@
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+
+from gain_knowledge.main.course_tree import import_course, read_manifest, ArchiveError
+from gain_knowledge.main.models import Category
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Imports a course archive created by export_course'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Username of the new course owner')
+        parser.add_argument('--category', type=int, help='Defaults to the category with the archived title')
+
+    def handle(self, *args, **options):
+        user = UserModel.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        try:
+            with open(options['path'], 'rb') as file:
+                category = self.get_category(file, options['category'])
+                course = import_course(file, user, category)
+        except ArchiveError as error:
+            raise CommandError(error)
+        self.stdout.write(f'Imported {course} with id {course.pk}')
+
+    @staticmethod
+    def get_category(file, category_id):
+        if category_id is not None:
+            category = Category.objects.filter(pk=category_id).first()
+        else:
+            try:
+                with zipfile.ZipFile(file) as archive:
+                    title = read_manifest(archive)['category']
+            except zipfile.BadZipFile:
+                raise ArchiveError('The file is not a course archive')
+            file.seek(0)
+            category = Category.objects.filter(title=title).first()
+        if category is None:
+            raise ArchiveError('The category does not exist')
+        return category
@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand, CommandError
+
+from gain_knowledge.main import question_bank
+from gain_knowledge.main.models import Test
+
+
+class Command(BaseCommand):
+    help = 'Imports a CSV, JSON or JSONL question bank into a test'
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=question_bank.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=question_bank.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the rows')
+
+    def handle(self, *args, **options):
+        if not Test.objects.filter(pk=options['test_id']).exists():
+            raise CommandError(f"Test {options['test_id']} does not exist")
+        try:
+            file_format = options['format'] or question_bank.guess_format(options['path'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        with open(options['path'], 'rb') as file:
+            rows = question_bank.read_rows(file, file_format)
+            result = question_bank.import_questions(
+                options['test_id'], rows, options['batch_size'], options['dry_run'])
+
+        for error in result.errors:
+            self.stderr.write(f'Row {error.row or "-"}: {error.errors}')
+        verb = 'Valid' if options['dry_run'] else 'Imported'
+        self.stdout.write(f'{verb}: {result.created}, failed: {result.failed}')
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from gain_knowledge.main.models import TestScoreSummary, UserScoreSummary, LeaderboardEntry
+from gain_knowledge.main.scores import rebuild_score_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the test, user and leaderboard score summaries from all finished attempts'
+
+    def handle(self, *args, **options):
+        rebuild_score_summaries()
+        self.stdout.write(
+            f'Tests: {TestScoreSummary.objects.count()}, users: {UserScoreSummary.objects.count()}, '
+            f'leaderboard entries: {LeaderboardEntry.objects.count()}'
+        )
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from gain_knowledge.main.models import SearchDocument
+from gain_knowledge.main.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search index from all courses and questions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuild_index(options['batch_size'])
+        self.stdout.write(f'Indexed documents: {SearchDocument.objects.count()}')
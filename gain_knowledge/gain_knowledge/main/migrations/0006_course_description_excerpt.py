@@ -0,0 +1,29 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:14
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_description_excerpts(apps, schema_editor):
+    Course = apps.get_model('main', 'Course')
+    max_length = Course._meta.get_field('description_excerpt').max_length
+    courses = list(Course.objects.only('id', 'description'))
+    for course in courses:
+        course.description_excerpt = Truncator(course.description).chars(max_length)
+    Course.objects.bulk_update(courses, ('description_excerpt',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_testattempt_answerrecord_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='description_excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_description_excerpts, migrations.RunPython.noop),
+    ]
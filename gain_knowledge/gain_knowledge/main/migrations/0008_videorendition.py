@@ -0,0 +1,25 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('mp4', 'mp4'), ('webm', 'webm'), ('hls', 'hls')], max_length=4)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('bitrate_kbps', models.PositiveIntegerField(blank=True, null=True)),
+                ('file', models.FileField(max_length=255, upload_to='')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='main.course')),
+            ],
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:29
+
+import itertools
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+ADD_SEARCH_VECTOR_SQL = """
+ALTER TABLE main_searchdocument ADD COLUMN vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(body, '')), 'B')
+) STORED;
+CREATE INDEX main_searchdocument_vector_gin ON main_searchdocument USING gin (vector);
+"""
+
+REMOVE_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS main_searchdocument_vector_gin;
+ALTER TABLE main_searchdocument DROP COLUMN IF EXISTS vector;
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_SEARCH_VECTOR_SQL)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REMOVE_SEARCH_VECTOR_SQL)
+
+
+BATCH_SIZE = 500
+
+
+def fill_search_documents(apps, schema_editor):
+    Course = apps.get_model('main', 'Course')
+    Question = apps.get_model('main', 'Question')
+    SearchDocument = apps.get_model('main', 'SearchDocument')
+
+    documents = itertools.chain(
+        (
+            SearchDocument(kind='course', object_id=course.id, course_id=course.id,
+                           title=course.title, body=course.description)
+            for course in Course.objects.only('id', 'title', 'description').iterator(chunk_size=BATCH_SIZE)
+        ),
+        (
+            SearchDocument(kind='question', object_id=question.id, course_id=question.test.course_id,
+                           title=question.title,
+                           body='\n'.join((question.first_option, question.second_option,
+                                           question.third_option, question.fourth_option)))
+            for question in Question.objects.select_related('test').iterator(chunk_size=BATCH_SIZE)
+        ),
+    )
+    while batch := list(itertools.islice(documents, BATCH_SIZE)):
+        SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_documentpreview_documentpage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'course'), ('question', 'question')], max_length=8)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.TextField()),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.course')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document_kind_object'),
+        ),
+        migrations.RunPython(add_search_vector, remove_search_vector),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
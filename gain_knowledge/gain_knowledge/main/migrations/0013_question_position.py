@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def fill_question_positions(apps, schema_editor):
+    Question = apps.get_model('main', 'Question')
+    batch = []
+    test_ids = Question.objects.order_by('test_id').values_list('test_id', flat=True).distinct()
+    for test_id in test_ids.iterator():
+        questions = Question.objects.filter(test_id=test_id).only('id').order_by('id')
+        for position, question in enumerate(questions.iterator(chunk_size=BATCH_SIZE), 1):
+            question.position = position
+            batch.append(question)
+            if len(batch) >= BATCH_SIZE:
+                Question.objects.bulk_update(batch, ('position',), batch_size=BATCH_SIZE)
+                batch = []
+    Question.objects.bulk_update(batch, ('position',), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='position',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_question_positions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='question',
+            name='position',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(fields=('test', 'position'), name='unique_question_test_position'),
+        ),
+        migrations.RemoveIndex(
+            model_name='question',
+            name='question_test_id_idx',
+        ),
+    ]
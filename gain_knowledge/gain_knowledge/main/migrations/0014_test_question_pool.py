@@ -0,0 +1,29 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:42
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_question_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='question_count',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='shuffle_options',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='seed',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum, Max
+
+
+def fill_score_summaries(apps, schema_editor):
+    TestAttempt = apps.get_model('main', 'TestAttempt')
+    TestScoreSummary = apps.get_model('main', 'TestScoreSummary')
+    UserScoreSummary = apps.get_model('main', 'UserScoreSummary')
+    LeaderboardEntry = apps.get_model('main', 'LeaderboardEntry')
+
+    attempts = TestAttempt.objects.filter(finished_at__isnull=False)
+    updated = []
+    for attempt in attempts.iterator():
+        total_answers = attempt.correct_answers + attempt.incorrect_answers
+        attempt.score = int(attempt.correct_answers / total_answers * 100) if total_answers else 0
+        updated.append(attempt)
+    TestAttempt.objects.bulk_update(updated, ('score',), batch_size=1000)
+
+    TestScoreSummary.objects.bulk_create(
+        TestScoreSummary(**row) for row in attempts.order_by().values('test_id').annotate(
+            attempt_count=Count('id'), score_total=Sum('score'), best_score=Max('score'))
+    )
+    UserScoreSummary.objects.bulk_create(
+        UserScoreSummary(**row) for row in attempts.order_by().values('user_id').annotate(
+            attempt_count=Count('id'), correct_answers=Sum('correct_answers'),
+            incorrect_answers=Sum('incorrect_answers'), score_total=Sum('score'))
+    )
+
+    entries = {}
+    for test_id, user_id, score, finished_at in attempts.order_by('-score', 'finished_at') \
+            .values_list('test_id', 'user_id', 'score', 'finished_at').iterator():
+        entry = entries.setdefault((test_id, user_id), LeaderboardEntry(
+            test_id=test_id, user_id=user_id, best_score=score, best_at=finished_at))
+        entry.attempt_count += 1
+    LeaderboardEntry.objects.bulk_create(entries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0003_delete_currentresult'),
+        ('main', '0014_test_question_pool'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestScoreSummary',
+            fields=[
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_summary', serialize=False, to='main.test')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('score_total', models.PositiveBigIntegerField(default=0)),
+                ('best_score', models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserScoreSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('correct_answers', models.PositiveBigIntegerField(default=0)),
+                ('incorrect_answers', models.PositiveBigIntegerField(default=0)),
+                ('score_total', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('best_score', models.PositiveSmallIntegerField(default=0)),
+                ('best_at', models.DateTimeField(blank=True, null=True)),
+                ('test', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='main.test')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['test', '-best_score', 'best_at'], name='leaderboard_test_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('test', 'user'), name='unique_leaderboard_test_user'),
+        ),
+        migrations.RunPython(fill_score_summaries, migrations.RunPython.noop),
+    ]
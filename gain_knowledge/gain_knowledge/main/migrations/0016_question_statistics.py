@@ -0,0 +1,28 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_score_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStatistics',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='main.question')),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('p_value', models.FloatField()),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('first_option_rate', models.FloatField(default=0)),
+                ('second_option_rate', models.FloatField(default=0)),
+                ('third_option_rate', models.FloatField(default=0)),
+                ('fourth_option_rate', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.3 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_question_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testattempt',
+            name='total_questions',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,14 @@
+import os
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.validators import MinLengthValidator, FileExtensionValidator
-from django.db import models
+from django.core.validators import MinLengthValidator, FileExtensionValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.text import Truncator
 
 from gain_knowledge.main.validators import validate_only_letters, MaxFileSizeInMbValidator
 
@@ -31,12 +39,23 @@ class Category(models.Model):
 
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [
+            models.Index(
+                fields=('title',),
+                name='category_title_idx',
+            ),
+        ]
 
 
 class Course(models.Model):
     TITLE_MIN_LENGTH = 2
     TITLE_MAX_LENGTH = 30
     IMAGE_MAX_SIZE_IN_MB = 5
+    VIDEO_MAX_SIZE_IN_MB = 2048
+    DOCUMENT_MAX_SIZE_IN_MB = 100
+    DESCRIPTION_EXCERPT_MAX_LENGTH = 150
+    VIDEO_EXTENSIONS = ['MOV', 'avi', 'mp4', 'webm', 'mkv']
+    DOCUMENT_EXTENSIONS = ['pdf']
 
     title = models.CharField(
         max_length=TITLE_MAX_LENGTH,
@@ -47,9 +66,16 @@ class Course(models.Model):
 
     description = models.TextField()
 
+    description_excerpt = models.CharField(
+        max_length=DESCRIPTION_EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+    )
+
     category = models.ForeignKey(
         Category,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
 
     picture = models.ImageField(
@@ -62,22 +88,46 @@ class Course(models.Model):
     video = models.FileField(
         upload_to='videos',
         validators=(
-            FileExtensionValidator(allowed_extensions=['MOV', 'avi', 'mp4', 'webm', 'mkv']),
+            FileExtensionValidator(allowed_extensions=VIDEO_EXTENSIONS),
         )
     )
 
     document = models.FileField(
         upload_to='documents',
         validators=(
-            FileExtensionValidator(allowed_extensions=['pdf']),
+            FileExtensionValidator(allowed_extensions=DOCUMENT_EXTENSIONS),
         )
     )
 
     user = models.ForeignKey(
         UserModel,
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('category', 'id'),
+                name='course_category_id_idx',
+            ),
+            models.Index(
+                fields=('user', 'id'),
+                name='course_user_id_idx',
+            ),
+        ]
+
+    @classmethod
+    def make_description_excerpt(cls, description):
+        return Truncator(description).chars(cls.DESCRIPTION_EXCERPT_MAX_LENGTH)
+
+    def save(self, *args, **kwargs):
+        self.description_excerpt = self.make_description_excerpt(self.description)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'description_excerpt'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.title}'
 
@@ -85,6 +135,7 @@ class Course(models.Model):
 class Test(models.Model):
     TITLE_MIN_LENGTH = 2
     TITLE_MAX_LENGTH = 30
+    QUESTION_COUNT_MIN_VALUE = 1
 
     title = models.CharField(
         max_length=TITLE_MAX_LENGTH,
@@ -95,9 +146,30 @@ class Test(models.Model):
 
     course = models.ForeignKey(
         Course,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
 
+    question_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=(
+            MinValueValidator(QUESTION_COUNT_MIN_VALUE),
+        ),
+    )
+
+    shuffle_options = models.BooleanField(
+        default=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('course', 'id'),
+                name='test_course_id_idx',
+            ),
+        ]
+
     def __str__(self):
         return f'{self.title}'
 
@@ -113,7 +185,8 @@ class Question(models.Model):
 
     test = models.ForeignKey(
         Test,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
 
     first_option = models.TextField()
@@ -129,8 +202,559 @@ class Question(models.Model):
         choices=OPTIONS,
     )
 
+    position = models.PositiveIntegerField(
+        editable=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('test', 'position'),
+                name='unique_question_test_position',
+            ),
+        ]
+
+    @classmethod
+    def next_position(cls, test_id):
+        # Locking the parent test serializes concurrent inserts, so they cannot pick the same position.
+        list(Test.objects.select_for_update().filter(pk=test_id).values_list('pk', flat=True))
+        last_position = cls.objects.filter(test_id=test_id).aggregate(models.Max('position'))['position__max']
+        return (last_position or 0) + 1
+
+    @classmethod
+    def reorder(cls, test_id, question_ids):
+        questions = cls.objects.filter(test_id=test_id)
+        reordered = [cls(id=question_id, position=position) for position, question_id in enumerate(question_ids, 1)]
+
+        with transaction.atomic():
+            offset = len(question_ids) + cls.next_position(test_id)
+            current_ids = list(questions.select_for_update().values_list('id', flat=True))
+            if sorted(current_ids) != sorted(question_ids):
+                raise ValueError('The new order must contain every question of the test exactly once')
+
+            # Move every question past the current range first, so no intermediate state breaks the unique constraint
+            questions.update(position=F('position') + offset)
+            cls.objects.bulk_update(reordered, ('position',))
+
+    def save(self, *args, **kwargs):
+        if self.position is not None:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            self.position = self.next_position(self.test_id)
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.title}'
 
 
+class TestAttempt(models.Model):
+    user = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+    )
+
+    test = models.ForeignKey(
+        Test,
+        on_delete=models.CASCADE,
+    )
+
+    correct_answers = models.PositiveIntegerField(
+        default=0,
+    )
+
+    incorrect_answers = models.PositiveIntegerField(
+        default=0,
+    )
+
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    seed = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    score = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    total_questions = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    @property
+    def total_answers(self):
+        return self.correct_answers + self.incorrect_answers
+
+    @property
+    def question_total(self):
+        return self.total_answers if self.total_questions is None else self.total_questions
+
+    @property
+    def is_complete(self):
+        return self.total_answers >= self.question_total
+
+    @property
+    def percentage(self):
+        if not self.question_total:
+            return 0
+        return int(self.correct_answers / self.question_total * 100)
+
+    def record_answer(self, question_id, answer, is_correct):
+        with transaction.atomic():
+            _, created = AnswerRecord.objects.get_or_create(
+                attempt_id=self.pk,
+                question_id=question_id,
+                defaults={
+                    'answer': answer,
+                    'is_correct': is_correct,
+                },
+            )
+            if created:
+                counter = 'correct_answers' if is_correct else 'incorrect_answers'
+                TestAttempt.objects.filter(pk=self.pk).update(**{counter: F(counter) + 1})
+        return created
+
+    @classmethod
+    def create_graded(cls, user, test_id, question_ids, answers, answer_key, seed=None):
+        results = [answer_key.grade(question_id, answer) for question_id, answer in zip(question_ids, answers)]
+        correct_answers = sum(results)
+        attempt = cls(
+            user=user,
+            test_id=test_id,
+            correct_answers=correct_answers,
+            incorrect_answers=len(results) - correct_answers,
+            finished_at=timezone.now(),
+            seed=seed,
+            total_questions=len(question_ids),
+        )
+        attempt.score = attempt.percentage
+        with transaction.atomic():
+            attempt.save()
+            AnswerRecord.objects.bulk_create(
+                AnswerRecord(attempt=attempt, question_id=question_id, answer=answer, is_correct=is_correct)
+                for question_id, answer, is_correct in zip(question_ids, answers, results)
+            )
+            if attempt.is_complete:
+                attempt.record_score()
+        return attempt
+
+    def finish(self):
+        with transaction.atomic():
+            attempt = TestAttempt.objects.select_for_update().filter(pk=self.pk, finished_at__isnull=True).first()
+            if attempt is None or not attempt.is_complete:
+                return False
+            attempt.finished_at = timezone.now()
+            attempt.score = attempt.percentage
+            attempt.save(update_fields=('finished_at', 'score'))
+            attempt.record_score()
+        return True
+
+    def record_score(self):
+        TestScoreSummary.record(self)
+        UserScoreSummary.record(self)
+        LeaderboardEntry.record(self)
+
+    def __str__(self):
+        return f'{self.user} - {self.test}'
+
+
+class AnswerRecord(models.Model):
+    attempt = models.ForeignKey(
+        TestAttempt,
+        on_delete=models.CASCADE,
+    )
+
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.CASCADE,
+    )
+
+    answer = models.CharField(
+        max_length=max(len(x) for x, _ in Question.OPTIONS),
+        choices=Question.OPTIONS,
+    )
+
+    is_correct = models.BooleanField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('attempt', 'question'), name='unique_attempt_question_answer'),
+        )
+
+
+class QuestionStatistics(models.Model):
+    OPTION_RATE_FIELDS = ('first_option_rate', 'second_option_rate', 'third_option_rate', 'fourth_option_rate')
+
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+    )
+
+    response_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    p_value = models.FloatField()
+
+    discrimination = models.FloatField(
+        null=True,
+        blank=True,
+    )
+
+    first_option_rate = models.FloatField(
+        default=0,
+    )
+
+    second_option_rate = models.FloatField(
+        default=0,
+    )
+
+    third_option_rate = models.FloatField(
+        default=0,
+    )
+
+    fourth_option_rate = models.FloatField(
+        default=0,
+    )
+
+    computed_at = models.DateTimeField()
+
+    @property
+    def option_rates(self):
+        return [(code, getattr(self, field)) for (code, _), field in zip(Question.OPTIONS, self.OPTION_RATE_FIELDS)]
+
+
+class TestScoreSummary(models.Model):
+    test = models.OneToOneField(
+        Test,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_summary',
+    )
+
+    attempt_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    score_total = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    best_score = models.PositiveSmallIntegerField(
+        default=0,
+    )
+
+    @property
+    def mean_score(self):
+        if not self.attempt_count:
+            return 0
+        return round(self.score_total / self.attempt_count, 1)
+
+    @classmethod
+    def record(cls, attempt):
+        cls.objects.get_or_create(test_id=attempt.test_id)
+        cls.objects.filter(test_id=attempt.test_id).update(
+            attempt_count=F('attempt_count') + 1,
+            score_total=F('score_total') + attempt.score,
+            best_score=Greatest(F('best_score'), attempt.score),
+        )
+
+
+class UserScoreSummary(models.Model):
+    user = models.OneToOneField(
+        UserModel,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_summary',
+    )
+
+    attempt_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    correct_answers = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    incorrect_answers = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    score_total = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    @property
+    def mean_score(self):
+        if not self.attempt_count:
+            return 0
+        return round(self.score_total / self.attempt_count, 1)
+
+    @classmethod
+    def record(cls, attempt):
+        cls.objects.get_or_create(user_id=attempt.user_id)
+        cls.objects.filter(user_id=attempt.user_id).update(
+            attempt_count=F('attempt_count') + 1,
+            correct_answers=F('correct_answers') + attempt.correct_answers,
+            incorrect_answers=F('incorrect_answers') + attempt.incorrect_answers,
+            score_total=F('score_total') + attempt.score,
+        )
+
 
+class LeaderboardEntry(models.Model):
+    test = models.ForeignKey(
+        Test,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+
+    user = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+    )
+
+    attempt_count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    best_score = models.PositiveSmallIntegerField(
+        default=0,
+    )
+
+    best_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('test', 'user'), name='unique_leaderboard_test_user'),
+        )
+        indexes = [
+            models.Index(
+                fields=('test', '-best_score', 'best_at'),
+                name='leaderboard_test_rank_idx',
+            ),
+        ]
+
+    @classmethod
+    def record(cls, attempt):
+        cls.objects.get_or_create(test_id=attempt.test_id, user_id=attempt.user_id)
+        entries = cls.objects.filter(test_id=attempt.test_id, user_id=attempt.user_id)
+        entries.update(attempt_count=F('attempt_count') + 1)
+        entries.filter(models.Q(best_at__isnull=True) | models.Q(best_score__lt=attempt.score)).update(
+            best_score=attempt.score,
+            best_at=attempt.finished_at,
+        )
+
+
+class VideoRendition(models.Model):
+    MP4 = 'mp4'
+    WEBM = 'webm'
+    HLS = 'hls'
+
+    KINDS = [(x, x) for x in (MP4, WEBM, HLS)]
+
+    MIME_TYPES = {
+        MP4: 'video/mp4',
+        WEBM: 'video/webm',
+        HLS: 'application/vnd.apple.mpegurl',
+    }
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='renditions',
+    )
+
+    kind = models.CharField(
+        max_length=max(len(x) for x, _ in KINDS),
+        choices=KINDS,
+    )
+
+    height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    bitrate_kbps = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    file = models.FileField(
+        max_length=255,
+    )
+
+    @property
+    def mime_type(self):
+        return self.MIME_TYPES[self.kind]
+
+    def __str__(self):
+        return f'{self.course} - {self.kind} {self.height or ""}'
+
+
+class UploadSession(models.Model):
+    FILENAME_MAX_LENGTH = 255
+
+    VIDEO = 'video'
+    DOCUMENT = 'document'
+
+    FIELDS = [(x, x) for x in (VIDEO, DOCUMENT)]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+    )
+
+    field = models.CharField(
+        max_length=max(len(x) for x, _ in FIELDS),
+        choices=FIELDS,
+    )
+
+    filename = models.CharField(
+        max_length=FILENAME_MAX_LENGTH,
+    )
+
+    size = models.PositiveBigIntegerField()
+
+    received = models.PositiveBigIntegerField(
+        default=0,
+    )
+
+    is_complete = models.BooleanField(
+        default=False,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    @property
+    def temporary_path(self):
+        return os.path.join(settings.MEDIA_ROOT, settings.CHUNKED_UPLOAD_TEMP_DIR, f'{self.id}.part')
+
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size})'
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+    )
+
+    references = models.PositiveIntegerField(
+        default=0,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
+
+
+class DocumentPreview(models.Model):
+    document = models.CharField(
+        max_length=255,
+        unique=True,
+    )
+
+    page_count = models.PositiveIntegerField()
+
+    thumbnail = models.FileField(
+        max_length=255,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    def __str__(self):
+        return self.document
+
+
+class DocumentPage(models.Model):
+    preview = models.ForeignKey(
+        DocumentPreview,
+        on_delete=models.CASCADE,
+        related_name='pages',
+    )
+
+    number = models.PositiveIntegerField()
+
+    text = models.TextField(
+        blank=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('preview', 'number'),
+                name='unique_preview_page_number',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.preview} - {self.number}'
+
+
+class SearchDocument(models.Model):
+    COURSE = 'course'
+    QUESTION = 'question'
+
+    KINDS = [(x, x) for x in (COURSE, QUESTION)]
+
+    kind = models.CharField(
+        max_length=max(len(x) for x, _ in KINDS),
+        choices=KINDS,
+    )
+
+    object_id = models.PositiveBigIntegerField()
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    title = models.TextField()
+
+    body = models.TextField(
+        blank=True,
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('kind', 'object_id'),
+                name='unique_search_document_kind_object',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}: {self.title}'
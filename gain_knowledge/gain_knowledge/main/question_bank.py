@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.db import transaction
+
+from gain_knowledge.main.answer_keys import AnswerKey
+from gain_knowledge.main.forms import CreateQuestionForm
+from gain_knowledge.main.models import Question, Test
+from gain_knowledge.main.search import index_questions
+
+CSV = 'csv'
+JSON = 'json'
+JSONL = 'jsonl'
+FORMATS = (CSV, JSON, JSONL)
+CONTENT_TYPES = {
+    CSV: 'text/csv',
+    JSON: 'application/json',
+    JSONL: 'application/x-ndjson',
+}
+
+FIELDS = CreateQuestionForm.Meta.fields
+BATCH_SIZE = 500
+READ_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+RowError = namedtuple('RowError', ('row', 'errors'))
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row, errors))
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': [{'row': x.row, 'errors': x.errors} for x in self.errors],
+        }
+
+
+def guess_format(file_name):
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f'Unsupported format: {extension}')
+    return extension
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    expected = '['
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer = (buffer + chunk).lstrip()
+        while buffer:
+            if expected == '[':
+                if buffer[0] != '[':
+                    raise ValueError('Expected a JSON array of questions')
+                buffer = buffer[1:].lstrip()
+                expected = 'first value'
+            elif expected in ('first value', 'value'):
+                if expected == 'first value' and buffer[0] == ']':
+                    return
+                try:
+                    value, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if chunk:
+                        break
+                    raise
+                yield value
+                buffer = buffer[end:].lstrip()
+                expected = 'separator'
+            else:
+                if buffer[0] == ']':
+                    return
+                if buffer[0] != ',':
+                    raise ValueError('Expected "," or "]" between questions')
+                buffer = buffer[1:].lstrip()
+                expected = 'value'
+        if not chunk:
+            raise ValueError('Unexpected end of the JSON array')
+
+
+def iter_json_lines(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            yield error
+
+
+def read_rows(binary_stream, file_format):
+    stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    if file_format == CSV:
+        return csv.DictReader(stream)
+    if file_format == JSON:
+        return iter_json_array(stream)
+    return iter_json_lines(stream)
+
+
+def row_errors(row):
+    if isinstance(row, Exception):
+        return {'__all__': [str(row)]}
+    if not isinstance(row, dict):
+        return {'__all__': ['Each question must be an object']}
+    return None
+
+
+def import_questions(test_id, rows, batch_size=BATCH_SIZE, dry_run=False):
+    result = ImportResult()
+    course_id = Test.objects.values_list('course_id', flat=True).get(pk=test_id)
+    batch = []
+
+    def flush():
+        if not dry_run:
+            index_questions(Question.objects.bulk_create(batch), course_id)
+        result.created += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        position = Question.next_position(test_id)
+        try:
+            for number, row in enumerate(rows, 1):
+                errors = row_errors(row)
+                if errors is not None:
+                    result.add_error(number, errors)
+                    continue
+
+                form = CreateQuestionForm(test_id, data={field: row.get(field) for field in FIELDS})
+                if not form.is_valid():
+                    result.add_error(number, form.errors.get_json_data())
+                    continue
+
+                question = form.save(commit=False)
+                question.position = position
+                position += 1
+                batch.append(question)
+                if len(batch) >= batch_size:
+                    flush()
+        except (ValueError, csv.Error) as error:
+            result.add_error(None, {'__all__': [str(error)]})
+        flush()
+
+    if result.created and not dry_run:
+        AnswerKey.invalidate(test_id)
+    return result
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(test_id):
+    return Question.objects.filter(test_id=test_id).order_by('position').values(*FIELDS).iterator(chunk_size=BATCH_SIZE)
+
+
+def export_questions(test_id, file_format):
+    rows = export_rows(test_id)
+    if file_format == CSV:
+        writer = csv.DictWriter(Echo(), fieldnames=FIELDS)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+    elif file_format == JSON:
+        yield '['
+        for number, row in enumerate(rows):
+            yield (',\n' if number else '\n') + json.dumps(row, ensure_ascii=False)
+        yield '\n]\n'
+    else:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
@@ -0,0 +1,124 @@
+import random
+from collections import namedtuple
+
+from gain_knowledge.main.models import Question
+
+QuizStep = namedtuple('QuizStep', ('id', 'title', 'options'))
+
+
+def new_seed():
+    return random.getrandbits(31)
+
+
+def draw_question_ids(question_ids, count, seed):
+    if not count or count >= len(question_ids):
+        return question_ids
+    return random.Random(seed).sample(question_ids, count)
+
+
+def option_order(seed, question_id):
+    codes = list(QuizSession.OPTION_CODES)
+    random.Random(f'{seed}:{question_id}').shuffle(codes)
+    return codes
+
+
+class QuizSession:
+    SESSION_KEY_TEMPLATE = 'quiz_session_{}'
+    FORM_KEY_TEMPLATE = 'quiz_form_{}'
+    FORM_SNAPSHOTS_LIMIT = 5
+    SNAPSHOT_FIELDS = ('id', 'title', 'first_option', 'second_option', 'third_option', 'fourth_option')
+    OPTION_CODES = (Question.FIRST_OPTION, Question.SECOND_OPTION, Question.THIRD_OPTION, Question.FOURTH_OPTION)
+
+    def __init__(self, session, test_id, attempt_id, steps, seed=None, shuffle_options=False):
+        self.session = session
+        self.test_id = test_id
+        self.attempt_id = attempt_id
+        self.steps = steps
+        self.seed = seed
+        self.shuffle_options = shuffle_options
+
+    @classmethod
+    def session_key(cls, test_id):
+        return cls.SESSION_KEY_TEMPLATE.format(test_id)
+
+    @classmethod
+    def load_steps(cls, test, seed=None):
+        questions = Question.objects.filter(test_id=test.id)
+        if not test.question_count:
+            return [list(row) for row in questions.order_by('position').values_list(*cls.SNAPSHOT_FIELDS)]
+
+        question_ids = draw_question_ids(
+            list(questions.order_by('position').values_list('id', flat=True)), test.question_count, seed)
+        rows = {row[0]: list(row) for row in questions.filter(id__in=question_ids).values_list(*cls.SNAPSHOT_FIELDS)}
+        return [rows[question_id] for question_id in question_ids if question_id in rows]
+
+    @classmethod
+    def start(cls, session, test, attempt, steps):
+        session[cls.session_key(test.id)] = {
+            'attempt_id': attempt.id,
+            'steps': steps,
+            'seed': attempt.seed,
+            'shuffle_options': test.shuffle_options,
+        }
+        return cls(session, test.id, attempt.id, steps, attempt.seed, test.shuffle_options)
+
+    @classmethod
+    def load(cls, session, test_id):
+        snapshot = session.get(cls.session_key(test_id))
+        if snapshot is None:
+            return None
+        return cls(session, test_id, snapshot['attempt_id'], snapshot['steps'], snapshot.get('seed'),
+                   snapshot.get('shuffle_options', False))
+
+    @classmethod
+    def start_form(cls, session, test):
+        seed = new_seed()
+        steps = cls.load_steps(test, seed)
+        key = cls.FORM_KEY_TEMPLATE.format(test.id)
+        snapshots = session.get(key, {})
+        snapshots[str(seed)] = {
+            'steps': steps,
+            'shuffle_options': test.shuffle_options,
+        }
+        session[key] = dict(list(snapshots.items())[-cls.FORM_SNAPSHOTS_LIMIT:])
+        return cls(session, test.id, None, steps, seed, test.shuffle_options)
+
+    @classmethod
+    def load_form(cls, session, test_id, token):
+        snapshot = session.get(cls.FORM_KEY_TEMPLATE.format(test_id), {}).get(token)
+        if snapshot is None:
+            return None
+        return cls(session, test_id, None, snapshot['steps'], int(token), snapshot['shuffle_options'])
+
+    @property
+    def form_token(self):
+        return str(self.seed)
+
+    def finish_form(self):
+        key = self.FORM_KEY_TEMPLATE.format(self.test_id)
+        snapshots = self.session.get(key, {})
+        snapshots.pop(self.form_token, None)
+        self.session[key] = snapshots
+
+    def __len__(self):
+        return len(self.steps)
+
+    @classmethod
+    def to_step(cls, row, seed=None, shuffle_options=False):
+        question_id, title, *options = row
+        options = list(zip(cls.OPTION_CODES, options))
+        if shuffle_options and seed is not None:
+            options = [options[cls.OPTION_CODES.index(code)] for code in option_order(seed, question_id)]
+        return QuizStep(question_id, title, options)
+
+    def step(self, index):
+        return self.to_step(self.steps[index], self.seed, self.shuffle_options)
+
+    def first_unanswered(self, answered_ids):
+        return next((index for index, row in enumerate(self.steps) if row[0] not in answered_ids), None)
+
+    def is_last(self, index):
+        return index >= len(self.steps) - 1
+
+    def finish(self):
+        self.session.pop(self.session_key(self.test_id), None)
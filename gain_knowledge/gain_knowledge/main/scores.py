@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum, Max
+
+from gain_knowledge.main.models import TestAttempt, TestScoreSummary, UserScoreSummary, LeaderboardEntry
+
+BATCH_SIZE = 1000
+
+
+def leaderboard(test_id, limit=None):
+    return LeaderboardEntry.objects.filter(test_id=test_id).select_related('user') \
+        .order_by('-best_score', 'best_at')[:limit or settings.LEADERBOARD_SIZE]
+
+
+def fill_missing_scores(attempts):
+    batch = []
+    for attempt in attempts.filter(score__isnull=True).iterator(chunk_size=BATCH_SIZE):
+        attempt.score = attempt.percentage
+        batch.append(attempt)
+        if len(batch) >= BATCH_SIZE:
+            TestAttempt.objects.bulk_update(batch, ('score',))
+            batch = []
+    TestAttempt.objects.bulk_update(batch, ('score',))
+
+
+def leaderboard_entries(attempts):
+    entry = None
+    rows = attempts.order_by('test_id', 'user_id', '-score', 'finished_at') \
+        .values_list('test_id', 'user_id', 'score', 'finished_at')
+    for test_id, user_id, score, finished_at in rows.iterator(chunk_size=BATCH_SIZE):
+        if entry is None or (entry.test_id, entry.user_id) != (test_id, user_id):
+            if entry is not None:
+                yield entry
+            entry = LeaderboardEntry(test_id=test_id, user_id=user_id, best_score=score, best_at=finished_at)
+        entry.attempt_count += 1
+    if entry is not None:
+        yield entry
+
+
+def rebuild_score_summaries():
+    attempts = TestAttempt.objects.filter(finished_at__isnull=False)
+    with transaction.atomic():
+        fill_missing_scores(attempts)
+
+        TestScoreSummary.objects.all().delete()
+        TestScoreSummary.objects.bulk_create(
+            (TestScoreSummary(**row) for row in attempts.order_by().values('test_id').annotate(
+                attempt_count=Count('id'),
+                score_total=Sum('score'),
+                best_score=Max('score'),
+            )),
+            batch_size=BATCH_SIZE,
+        )
+
+        UserScoreSummary.objects.all().delete()
+        UserScoreSummary.objects.bulk_create(
+            (UserScoreSummary(**row) for row in attempts.order_by().values('user_id').annotate(
+                attempt_count=Count('id'),
+                correct_answers=Sum('correct_answers'),
+                incorrect_answers=Sum('incorrect_answers'),
+                score_total=Sum('score'),
+            )),
+            batch_size=BATCH_SIZE,
+        )
+
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(leaderboard_entries(attempts), batch_size=BATCH_SIZE)
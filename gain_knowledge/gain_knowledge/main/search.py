@@ -0,0 +1,192 @@
+import math
+import re
+import threading
+from collections import defaultdict
+from itertools import islice
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, F, FloatField
+from django.db.models.expressions import RawSQL
+
+from gain_knowledge.common.cache import bump_version, get_versions
+from gain_knowledge.main.models import SearchDocument, Course, Question, Test
+
+REFRESH_OVERLAP = timedelta(minutes=1)
+TOKEN_PATTERN = re.compile(r'\w+')
+TITLE_WEIGHT = 2
+BODY_WEIGHT = 1
+SEARCH_CONFIG = 'english'
+TS_QUERY = 'websearch_to_tsquery(%s::regconfig, %s)'
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def course_document(course):
+    return {'course_id': course.pk, 'title': course.title, 'body': course.description}
+
+
+def question_document(question, course_id=None):
+    if course_id is None:
+        course_id = Test.objects.values_list('course_id', flat=True).get(pk=question.test_id)
+    options = (question.first_option, question.second_option, question.third_option, question.fourth_option)
+    return {'course_id': course_id, 'title': question.title, 'body': '\n'.join(options)}
+
+
+def index_object(kind, object_id, document):
+    SearchDocument.objects.update_or_create(kind=kind, object_id=object_id, defaults=document)
+
+
+def index_questions(questions, course_id):
+    SearchDocument.objects.bulk_create(
+        SearchDocument(kind=SearchDocument.QUESTION, object_id=question.pk, **question_document(question, course_id))
+        for question in questions if question.pk is not None
+    )
+
+
+def remove_object(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+    # Other processes cannot see deletions through updated_at (the documents may also have been removed already by the
+    # course cascade), so make every process reload its index.
+    transaction.on_commit(lambda: bump_version(SearchDocument))
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.document_tokens = {}
+        self.document_versions = {}
+        self.synced_at = None
+        self.version = None
+        # add and clear take the lock themselves, and refresh calls them while holding it
+        self.lock = threading.RLock()
+
+    def add(self, document_id, title, body):
+        with self.lock:
+            self.__remove(document_id)
+            weights = defaultdict(int)
+            for token in tokenize(title):
+                weights[token] += TITLE_WEIGHT
+            for token in tokenize(body):
+                weights[token] += BODY_WEIGHT
+            for token, weight in weights.items():
+                self.postings[token][document_id] = weight
+            self.document_tokens[document_id] = tuple(weights)
+
+    def __remove(self, document_id):
+        self.document_versions.pop(document_id, None)
+        for token in self.document_tokens.pop(document_id, ()):
+            postings = self.postings[token]
+            postings.pop(document_id, None)
+            if not postings:
+                del self.postings[token]
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.document_tokens.clear()
+            self.document_versions.clear()
+            self.synced_at = None
+            self.version = None
+
+    def refresh(self):
+        with self.lock:
+            version = get_versions((SearchDocument,))[SearchDocument._meta.model_name]
+            if version != self.version:
+                self.clear()
+                self.version = version
+
+            documents = SearchDocument.objects.order_by()
+            if self.synced_at is not None:
+                recent = documents.filter(updated_at__gte=self.synced_at - REFRESH_OVERLAP)
+                versions = recent.values_list('id', 'updated_at')
+                changed_ids = [x for x, updated_at in versions if self.document_versions.get(x) != updated_at]
+                if not changed_ids:
+                    return
+                documents = documents.filter(id__in=changed_ids)
+
+            for document in documents.only('id', 'title', 'body', 'updated_at').iterator(chunk_size=2000):
+                self.add(document.id, document.title, document.body)
+                self.document_versions[document.id] = document.updated_at
+                if self.synced_at is None or document.updated_at > self.synced_at:
+                    self.synced_at = document.updated_at
+
+    def search(self, query):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self.lock:
+            postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+            if not postings[0]:
+                return []
+            candidates = set(postings[0]).intersection(*postings[1:])
+            total = len(self.document_tokens)
+            scores = {document_id: 0.0 for document_id in candidates}
+            for term_postings in postings:
+                idf = math.log(1 + total / len(term_postings))
+                for document_id in candidates:
+                    scores[document_id] += term_postings[document_id] * idf
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+inverted_index = InvertedIndex()
+
+
+def bulk_create_in_batches(documents, batch_size):
+    # bulk_create turns its argument into a list, so feed it one batch at a time to keep memory bounded
+    documents = iter(documents)
+    while batch := list(islice(documents, batch_size)):
+        SearchDocument.objects.bulk_create(batch)
+
+
+def rebuild_index(batch_size=1000):
+    SearchDocument.objects.all().delete()
+    bump_version(SearchDocument)
+
+    courses = Course.objects.only('id', 'title', 'description').iterator(chunk_size=batch_size)
+    bulk_create_in_batches((
+        SearchDocument(kind=SearchDocument.COURSE, object_id=course.pk, **course_document(course))
+        for course in courses
+    ), batch_size)
+
+    questions = Question.objects.annotate(course_id=F('test__course_id')).iterator(chunk_size=batch_size)
+    bulk_create_in_batches((
+        SearchDocument(kind=SearchDocument.QUESTION, object_id=question.pk,
+                       **question_document(question, question.course_id))
+        for question in questions
+    ), batch_size)
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def search_postgresql(query, offset, limit):
+    parameters = (SEARCH_CONFIG, query)
+    return list(
+        SearchDocument.objects
+        .filter(RawSQL(f'vector @@ {TS_QUERY}', parameters, output_field=BooleanField()))
+        .annotate(rank=RawSQL(f'ts_rank_cd(vector, {TS_QUERY})', parameters, output_field=FloatField()))
+        .order_by('-rank', 'id')[offset:offset + limit]
+    )
+
+
+def search_inverted_index(query, offset, limit):
+    inverted_index.refresh()
+    ranked = inverted_index.search(query)[offset:offset + limit]
+    documents = SearchDocument.objects.in_bulk([document_id for document_id, _ in ranked])
+    results = []
+    for document_id, rank in ranked:
+        if document_id in documents:
+            document = documents[document_id]
+            document.rank = rank
+            results.append(document)
+    return results
+
+
+def search(query, offset, limit):
+    if is_postgresql():
+        return search_postgresql(query, offset, limit)
+    return search_inverted_index(query, offset, limit)
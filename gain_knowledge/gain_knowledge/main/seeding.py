@@ -0,0 +1,92 @@
+import random
+import tempfile
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+
+from gain_knowledge.main.models import Category, Course, Test, Question
+
+UserModel = get_user_model()
+
+SEED_PASSWORD = 'benchmark-password'
+BATCH_SIZE = 1000
+
+
+@contextmanager
+def throwaway_database(keepdb=False):
+    old_database_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                MEDIA_ROOT=media_root,
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            cache.clear()
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=keepdb)
+
+
+def seed_users(count, prefix='seed_user'):
+    password = make_password(SEED_PASSWORD)
+    UserModel.objects.bulk_create(
+        (UserModel(username=f'{prefix}_{x}', password=password) for x in range(count)),
+        batch_size=BATCH_SIZE,
+    )
+    return list(UserModel.objects.filter(username__startswith=f'{prefix}_').order_by('id'))
+
+
+def seed_catalog(users, categories_count, courses_count, tests_count, questions_min, questions_max, rng=None):
+    rng = rng or random.Random(0)
+
+    Category.objects.bulk_create(
+        (Category(title=f'Category {x}', picture='images/category/seed.jpg') for x in range(categories_count)),
+        batch_size=BATCH_SIZE,
+    )
+    category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+
+    Course.objects.bulk_create(
+        (
+            Course(
+                title=f'Course {x}',
+                description=f'Description of course {x}. ' * 20,
+                description_excerpt=Course.make_description_excerpt(f'Description of course {x}. ' * 20),
+                category_id=rng.choice(category_ids),
+                picture='images/course/seed.jpg',
+                video='videos/seed.mp4',
+                document='documents/seed.pdf',
+                user=rng.choice(users),
+            ) for x in range(courses_count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    course_ids = list(Course.objects.order_by('id').values_list('id', flat=True))
+
+    Test.objects.bulk_create(
+        (Test(title=f'Test {x}', course_id=rng.choice(course_ids)) for x in range(tests_count)),
+        batch_size=BATCH_SIZE,
+    )
+    test_ids = list(Test.objects.order_by('id').values_list('id', flat=True))
+
+    Question.objects.bulk_create(
+        (
+            Question(
+                title=f'Question {number} of test {test_id}',
+                test_id=test_id,
+                first_option='First option',
+                second_option='Second option',
+                third_option='Third option',
+                fourth_option='Fourth option',
+                correct_answer=rng.choice(Question.OPTIONS)[0],
+                position=number + 1,
+            )
+            for test_id in test_ids
+            for number in range(rng.randint(questions_min, questions_max))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return test_ids
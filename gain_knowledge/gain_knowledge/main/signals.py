@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, post_init
+from django.dispatch import receiver
+
+from gain_knowledge.common.cache import bump_version
+from gain_knowledge.common.images import track_new_images, generate_new_image_derivatives
+from gain_knowledge.main.answer_keys import AnswerKey
+from gain_knowledge.main.blobs import track_blob_references, update_blob_references, release_blob_references
+from gain_knowledge.main.documents import enqueue_preview
+from gain_knowledge.main.models import Question, Category, Course, Test, SearchDocument
+from gain_knowledge.main.search import index_object, remove_object, course_document, question_document
+from gain_knowledge.main.transcoding import enqueue_transcoding, clear_renditions
+
+
+@receiver((post_save, post_delete), sender=Question)
+def invalidate_test_answer_key(sender, instance, **kwargs):
+    test_id = instance.test_id
+    AnswerKey.invalidate(test_id)
+    # A request may rebuild the key from the old rows before this transaction commits, so drop it again afterwards
+    transaction.on_commit(lambda: AnswerKey.invalidate(test_id))
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Course)
+@receiver((post_save, post_delete), sender=Test)
+def bump_catalog_cache_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Course)
+def track_new_catalog_images(sender, instance, **kwargs):
+    track_new_images(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Course)
+def generate_catalog_image_derivatives(sender, instance, **kwargs):
+    generate_new_image_derivatives(instance)
+
+
+@receiver(pre_save, sender=Course)
+def track_new_course_media(sender, instance, **kwargs):
+    instance._new_video = bool(instance.video) and not instance.video._committed
+    instance._new_document = bool(instance.document) and not instance.document._committed
+    previous_video = getattr(instance, '_blob_names', {}).get('video', '')
+    instance._video_changed = not instance._state.adding and (
+        instance._new_video or instance.video.name != previous_video)
+
+
+@receiver(post_save, sender=Course)
+def process_new_course_media(sender, instance, **kwargs):
+    if getattr(instance, '_video_changed', False):
+        instance._video_changed = False
+        clear_renditions(instance)
+    if getattr(instance, '_new_video', False):
+        instance._new_video = False
+        enqueue_transcoding(instance)
+    if getattr(instance, '_new_document', False):
+        instance._new_document = False
+        enqueue_preview(instance)
+
+
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Course)
+def track_catalog_blobs(sender, instance, **kwargs):
+    track_blob_references(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Course)
+def update_catalog_blobs(sender, instance, created, **kwargs):
+    update_blob_references(instance, created)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Course)
+def release_catalog_blobs(sender, instance, **kwargs):
+    release_blob_references(instance)
+
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, **kwargs):
+    index_object(SearchDocument.COURSE, instance.pk, course_document(instance))
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    index_object(SearchDocument.QUESTION, instance.pk, question_document(instance))
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_index(sender, instance, **kwargs):
+    remove_object(SearchDocument.COURSE, instance.pk)
+
+
+@receiver(post_delete, sender=Question)
+def remove_question_from_index(sender, instance, **kwargs):
+    remove_object(SearchDocument.QUESTION, instance.pk)
@@ -0,0 +1,36 @@
+from django.apps import apps
+
+from gain_knowledge.common.images import generate_derivatives
+from gain_knowledge.jobs.queue import register
+from gain_knowledge.main.analytics import compute_question_statistics, JOB_NAME
+from gain_knowledge.main.documents import extract_preview
+from gain_knowledge.main.models import Course
+from gain_knowledge.main.transcoding import transcode_course_video
+
+
+@register('images.generate_derivatives')
+def generate_image_derivatives(model, pk, field):
+    instance = apps.get_model(model)._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field)
+    if field_file:
+        generate_derivatives(field_file)
+
+
+@register('videos.transcode')
+def transcode_video(pk, video):
+    course = Course.objects.filter(pk=pk, video=video).first()
+    if course is None:
+        return
+    transcode_course_video(course)
+
+
+@register('documents.extract_preview')
+def extract_document_preview(document):
+    extract_preview(document)
+
+
+@register(JOB_NAME)
+def question_statistics():
+    compute_question_statistics()
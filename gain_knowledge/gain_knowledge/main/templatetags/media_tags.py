@@ -0,0 +1,47 @@
+from django import template
+
+from gain_knowledge.common.images import DERIVATIVE_FORMATS, derivative_name, derivative_widths, has_derivatives
+
+register = template.Library()
+
+
+def build_srcset(field_file, extension, widths):
+    storage = field_file.storage
+    return ', '.join(
+        f'{storage.url(derivative_name(field_file.name, width, extension))} {real_width}w'
+        for width, real_width in widths
+    )
+
+
+@register.filter
+def srcset(field_file, extension=DERIVATIVE_FORMATS[0][0]):
+    if not has_derivatives(field_file):
+        return ''
+    return build_srcset(field_file, extension, derivative_widths(field_file))
+
+
+@register.inclusion_tag('main/partials/responsive_image.html')
+def responsive_image(field_file, sizes='100vw', css_class='', alt='', height=None):
+    sources = []
+    fallback_url = field_file.url if field_file else ''
+    fallback_srcset = ''
+    if has_derivatives(field_file):
+        widths = derivative_widths(field_file)
+        sources = [
+            {'type': mime_type, 'srcset': build_srcset(field_file, extension, widths)}
+            for extension, _, mime_type in DERIVATIVE_FORMATS[:-1]
+        ]
+        fallback_extension = DERIVATIVE_FORMATS[-1][0]
+        fallback_name = derivative_name(field_file.name, widths[0][0], fallback_extension)
+        fallback_url = field_file.storage.url(fallback_name)
+        fallback_srcset = build_srcset(field_file, fallback_extension, widths)
+
+    return {
+        'sources': sources,
+        'fallback_url': fallback_url,
+        'fallback_srcset': fallback_srcset,
+        'sizes': sizes,
+        'css_class': css_class,
+        'alt': alt,
+        'height': height,
+    }
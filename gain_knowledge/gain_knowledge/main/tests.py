@@ -1,3 +1,1242 @@
-from django.test import TestCase
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from array import array
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image
+
+from gain_knowledge.common.images import DERIVATIVE_WIDTHS, derivative_name, derivative_names
+from gain_knowledge.common.instrumentation import metrics
+from gain_knowledge.common.storage import blob_name
+from gain_knowledge.jobs.management.commands import run_jobs
+from gain_knowledge.jobs.models import Job
+from gain_knowledge.jobs.queue import run_job, claim_jobs, enqueue, Heartbeat
+from gain_knowledge.main import question_bank
+from gain_knowledge.main.management.commands import explain_queries
+from gain_knowledge.main.analytics import compute_question_statistics
+from gain_knowledge.main.answer_keys import AnswerKey
+from gain_knowledge.main.course_tree import clone_course, export_course, import_course
+from gain_knowledge.main.documents import page_cache_path, evict_page_cache
+from gain_knowledge.main.models import Category, Course, Test, Question, TestAttempt, AnswerRecord, UploadSession, \
+    VideoRendition, MediaBlob, DocumentPreview, DocumentPage, SearchDocument, TestScoreSummary, UserScoreSummary, \
+    LeaderboardEntry, QuestionStatistics
+from gain_knowledge.main.quiz import QuizSession, draw_question_ids, option_order
+from gain_knowledge.main.scores import rebuild_score_summaries
+from gain_knowledge.main.search import inverted_index, InvertedIndex
+from gain_knowledge.main.uploads import write_chunk
+from gain_knowledge.main.views import CategoryListView
+
+UserModel = get_user_model()
+
+
+def create_category(**fields):
+    return Category.objects.create(**{
+        'title': 'Science',
+        'picture': 'images/category/science.jpg',
+        **fields,
+    })
+
+
+def create_course(user, category=None, **fields):
+    return Course.objects.create(**{
+        'title': 'Physics',
+        'description': 'Physics course',
+        'category': category or create_category(),
+        'picture': 'images/course/physics.jpg',
+        'video': 'videos/physics.mp4',
+        'document': 'documents/physics.pdf',
+        'user': user,
+        **fields,
+    })
+
+
+class QuizTests(django_test.TestCase):
+    VALID_USER_CREDENTIALS = {
+        'username': 'testuser',
+        'password': '12345qew',
+    }
+
+    QUESTIONS_COUNT = 3
+
+    def setUp(self):
+        self.user = UserModel.objects.create_user(**self.VALID_USER_CREDENTIALS)
+        course = create_course(self.user)
+        self.test = Test.objects.create(title='Basics', course=course)
+        for number in range(self.QUESTIONS_COUNT):
+            Question.objects.create(
+                title=f'Question {number}',
+                test=self.test,
+                first_option='First',
+                second_option='Second',
+                third_option='Third',
+                fourth_option='Fourth',
+                correct_answer=Question.FIRST_OPTION,
+            )
+        self.client.login(**self.VALID_USER_CREDENTIALS)
+
+    def __get_question(self, count_questions):
+        return self.client.get(reverse('display question', kwargs={
+            'pk_test': self.test.pk,
+            'count_questions': count_questions,
+        }))
+
+    def __answer_question(self, count_questions, answer):
+        return self.client.post(reverse('display question', kwargs={
+            'pk_test': self.test.pk,
+            'count_questions': count_questions,
+        }), {'answer': answer})
+
+    def __question_titles_in_order(self):
+        return list(Question.objects.filter(test=self.test).order_by('position').values_list('title', flat=True))
+
+    def test_display_question__when_question_pool__expect_drawn_questions_and_seed_stored(self):
+        Test.objects.filter(pk=self.test.pk).update(question_count=2, shuffle_options=True)
+
+        self.__get_question(0)
+        quiz = QuizSession.load(self.client.session, self.test.pk)
+        attempt = TestAttempt.objects.get(test=self.test)
+
+        self.assertEqual(2, len(quiz))
+        self.assertEqual(attempt.seed, quiz.seed)
+        self.assertEqual(draw_question_ids(list(Question.objects.filter(test=self.test).order_by('position')
+                                                .values_list('id', flat=True)), 2, attempt.seed),
+                         [row[0] for row in quiz.steps])
+
+    def test_display_question__when_options_shuffled__expect_canonical_answer_graded(self):
+        Test.objects.filter(pk=self.test.pk).update(shuffle_options=True)
+
+        self.__get_question(0)
+        quiz = QuizSession.load(self.client.session, self.test.pk)
+        step = quiz.step(0)
+        self.assertEqual(option_order(quiz.seed, step.id), [code for code, _ in step.options])
+
+        with self.assertNumQueries(0):
+            quiz.step(0)
+        self.__answer_question(0, Question.FIRST_OPTION)
+        self.assertEqual(1, TestAttempt.objects.get(test=self.test).correct_answers)
+
+    def test_answer_key__when_rebuilt_before_commit__expect_cache_invalidated_after_commit(self):
+        question = Question.objects.get(test=self.test, position=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.correct_answer = Question.SECOND_OPTION
+            question.save()
+            cache.set(AnswerKey.cache_key(self.test.pk), (array('q', [question.pk]), Question.FIRST_OPTION), None)
+
+        self.assertEqual(Question.SECOND_OPTION, AnswerKey.for_test(self.test.pk).correct_answer(question.pk))
+
+    def test_reorder_questions__when_question_moved_up__expect_positions_swapped_and_quiz_follows(self):
+        last = Question.objects.get(test=self.test, position=self.QUESTIONS_COUNT)
+
+        self.client.post(reverse('reorder questions', kwargs={'pk': self.test.pk}), {
+            'question': last.pk,
+            'offset': -1,
+        })
+
+        self.assertEqual(['Question 0', 'Question 2', 'Question 1'], self.__question_titles_in_order())
+        self.assertContains(self.__get_question(0), 'Question 0')
+        self.__answer_question(0, Question.FIRST_OPTION)
+        self.assertContains(self.__get_question(1), 'Question 2')
+
+    def test_reorder_questions__when_full_order_posted__expect_bulk_reorder(self):
+        question_ids = list(Question.objects.filter(test=self.test).order_by('-position').values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('reorder questions', kwargs={'pk': self.test.pk}), {'order': question_ids})
+
+        self.assertEqual(['Question 2', 'Question 1', 'Question 0'], self.__question_titles_in_order())
+        self.assertEqual(2, len([x for x in queries if x['sql'].startswith('UPDATE "main_question"')]))
+
+    def test_question_save__when_position_missing__expect_parent_test_locked(self):
+        with CaptureQueriesContext(connection) as queries:
+            question = Question.objects.create(title='Question 3', test=self.test, first_option='First',
+                                               second_option='Second', third_option='Third', fourth_option='Fourth',
+                                               correct_answer=Question.FIRST_OPTION)
+
+        self.assertEqual(self.QUESTIONS_COUNT + 1, question.position)
+        self.assertTrue([x for x in queries if x['sql'].startswith('SELECT "main_test"."id" FROM "main_test"')])
+
+    def test_reorder_questions__when_order_incomplete__expect_bad_request(self):
+        question_id = Question.objects.filter(test=self.test).values_list('id', flat=True).first()
+
+        response = self.client.post(reverse('reorder questions', kwargs={'pk': self.test.pk}), {'order': [question_id]})
+
+        self.assertEqual(400, response.status_code)
+
+    def test_display_question__when_quiz_started__expect_questions_not_queried_on_next_steps(self):
+        self.__get_question(0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.__answer_question(0, Question.FIRST_OPTION)
+            self.__get_question(1)
+
+        self.assertFalse([x for x in queries if Question._meta.db_table in x['sql']])
+
+    def test_display_question__when_last_question_answered__expect_redirect_to_final_score(self):
+        self.__get_question(0)
+        for count_questions in range(self.QUESTIONS_COUNT - 1):
+            self.__answer_question(count_questions, Question.FIRST_OPTION)
+
+        response = self.__answer_question(self.QUESTIONS_COUNT - 1, Question.SECOND_OPTION)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        final_score_url = reverse('final score', kwargs={'pk_test': self.test.pk, 'pk_attempt': attempt.pk})
+        self.assertRedirects(response, final_score_url)
+        response = self.client.get(final_score_url)
+        self.assertEqual(2, response.context['correct_answers'])
+        self.assertEqual(1, response.context['incorrect_answers'])
+        self.assertIsNotNone(TestAttempt.objects.get(pk=attempt.pk).finished_at)
+
+    def test_display_question__when_same_question_answered_twice__expect_counted_once(self):
+        self.__get_question(0)
+
+        self.__answer_question(0, Question.FIRST_OPTION)
+        self.__answer_question(0, Question.FIRST_OPTION)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertEqual(1, attempt.correct_answers)
+        self.assertEqual(1, AnswerRecord.objects.filter(attempt=attempt).count())
+
+    def test_display_question__when_correct_answer_edited__expect_grading_uses_new_answer(self):
+        self.__get_question(0)
+        question = Question.objects.filter(test=self.test).order_by('id').first()
+        question.correct_answer = Question.THIRD_OPTION
+        question.save()
+
+        self.__answer_question(0, Question.THIRD_OPTION)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertEqual(1, attempt.correct_answers)
+
+    def test_display_question__when_answer_posted_without_quiz_session__expect_redirect_to_first_step(self):
+        response = self.__answer_question(self.QUESTIONS_COUNT - 1, Question.FIRST_OPTION)
+
+        self.assertRedirects(response, reverse('display question', kwargs={
+            'pk_test': self.test.pk,
+            'count_questions': 0,
+        }), fetch_redirect_response=False)
+        self.assertFalse(TestAttempt.objects.filter(test=self.test).exists())
+
+    def test_display_question__when_first_step_reopened__expect_open_attempt_reused(self):
+        self.__get_question(0)
+        self.__answer_question(0, Question.FIRST_OPTION)
+
+        self.__get_question(0)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertEqual(1, attempt.correct_answers)
+
+    def test_display_question__when_test_has_no_questions__expect_no_attempt_created(self):
+        Question.objects.filter(test=self.test).delete()
+
+        response = self.__get_question(0)
+
+        self.assertTrue(response.context['no_question'])
+        self.assertFalse(TestAttempt.objects.filter(test=self.test).exists())
+
+    def test_display_question__when_index_out_of_range__expect_404(self):
+        self.__get_question(0)
+
+        response = self.__get_question(self.QUESTIONS_COUNT)
+
+        self.assertEqual(404, response.status_code)
+
+    def test_display_test__when_opened__expect_all_questions_in_one_formset(self):
+        response = self.client.get(reverse('display test', kwargs={'pk_test': self.test.pk}))
+
+        self.assertEqual(self.QUESTIONS_COUNT, len(response.context['formset'].forms))
+
+    def test_display_test__when_all_answers_submitted__expect_single_graded_attempt(self):
+        response = self.__submit_test((Question.FIRST_OPTION, Question.FIRST_OPTION, Question.FOURTH_OPTION))
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertRedirects(response, reverse('final score', kwargs={
+            'pk_test': self.test.pk,
+            'pk_attempt': attempt.pk,
+        }))
+        self.assertEqual(2, attempt.correct_answers)
+        self.assertEqual(1, attempt.incorrect_answers)
+        self.assertEqual(self.QUESTIONS_COUNT, AnswerRecord.objects.filter(attempt=attempt).count())
+
+    def __submit_test(self, answers, before_submit=None):
+        response = self.client.get(reverse('display test', kwargs={'pk_test': self.test.pk}))
+        question_ids = [form.step.id for form in response.context['formset']]
+        if before_submit is not None:
+            before_submit()
+        data = {
+            'quiz_form': response.context['quiz_form'],
+            'form-TOTAL_FORMS': len(answers),
+            'form-INITIAL_FORMS': 0,
+            **{f'form-{index}-answer': answer for index, answer in enumerate(answers)},
+            **{f'form-{index}-question': question_id for index, question_id in enumerate(question_ids)},
+        }
+        return self.client.post(reverse('display test', kwargs={'pk_test': self.test.pk}), data)
+
+    def test_display_test__when_questions_reordered_after_opening__expect_answers_graded_by_question(self):
+        last = Question.objects.get(test=self.test, position=self.QUESTIONS_COUNT)
+        Question.objects.filter(pk=last.pk).update(correct_answer=Question.SECOND_OPTION)
+        AnswerKey.invalidate(self.test.pk)
+        reversed_ids = list(Question.objects.filter(test=self.test).order_by('-position').values_list('id', flat=True))
+
+        self.__submit_test((Question.FIRST_OPTION, Question.FIRST_OPTION, Question.SECOND_OPTION),
+                           lambda: Question.reorder(self.test.pk, reversed_ids))
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertEqual((3, 0), (attempt.correct_answers, attempt.incorrect_answers))
+        self.assertEqual(Question.SECOND_OPTION, AnswerRecord.objects.get(attempt=attempt, question=last).answer)
+
+    def test_display_test__when_question_deleted_after_opening__expect_remaining_answers_graded(self):
+        first = Question.objects.get(test=self.test, position=1)
+
+        self.__submit_test((Question.FIRST_OPTION, Question.FIRST_OPTION, Question.FOURTH_OPTION), first.delete)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertEqual((1, 1, 2), (attempt.correct_answers, attempt.incorrect_answers, attempt.total_questions))
+
+    def test_display_test__when_opened_in_second_tab__expect_first_tab_still_graded(self):
+        url = reverse('display test', kwargs={'pk_test': self.test.pk})
+        first_tab = self.client.get(url)
+        self.client.get(url)
+        data = {
+            'quiz_form': first_tab.context['quiz_form'],
+            'form-TOTAL_FORMS': self.QUESTIONS_COUNT,
+            'form-INITIAL_FORMS': 0,
+            **{f'form-{index}-answer': Question.FIRST_OPTION for index in range(self.QUESTIONS_COUNT)},
+            **{f'form-{index}-question': form.step.id for index, form in enumerate(first_tab.context['formset'])},
+        }
+
+        response = self.client.post(url, data)
+
+        attempt = TestAttempt.objects.get(user=self.user, test=self.test)
+        self.assertRedirects(response, reverse('final score', kwargs={
+            'pk_test': self.test.pk,
+            'pk_attempt': attempt.pk,
+        }))
+
+    def test_final_score__when_attempts_finished__expect_score_summaries_updated_incrementally(self):
+        self.__submit_test((Question.FIRST_OPTION, Question.SECOND_OPTION, Question.SECOND_OPTION))
+        self.__get_question(0)
+        for count_questions in range(self.QUESTIONS_COUNT):
+            self.__answer_question(count_questions, Question.FIRST_OPTION)
+
+        summary = TestScoreSummary.objects.get(test=self.test)
+        self.assertEqual((2, 100, 66.5), (summary.attempt_count, summary.best_score, summary.mean_score))
+        user_summary = UserScoreSummary.objects.get(user=self.user)
+        self.assertEqual((4, 2), (user_summary.correct_answers, user_summary.incorrect_answers))
+        entry = LeaderboardEntry.objects.get(test=self.test, user=self.user)
+        self.assertEqual((2, 100), (entry.attempt_count, entry.best_score))
+
+    def test_display_question__when_last_step_answered_before_others__expect_unfinished_and_no_summaries(self):
+        self.__get_question(0)
+
+        response = self.__answer_question(self.QUESTIONS_COUNT - 1, Question.FIRST_OPTION)
+
+        self.assertRedirects(response, reverse('display question', kwargs={
+            'pk_test': self.test.pk,
+            'count_questions': 0,
+        }), fetch_redirect_response=False)
+        attempt = TestAttempt.objects.get(test=self.test)
+        self.assertIsNone(attempt.finished_at)
+        self.assertEqual((self.QUESTIONS_COUNT, 33), (attempt.total_questions, attempt.percentage))
+        self.assertFalse(TestScoreSummary.objects.exists())
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+    def test_leaderboard__when_rebuilt__expect_same_aggregates_as_incremental_updates(self):
+        self.__submit_test((Question.FIRST_OPTION, Question.SECOND_OPTION, Question.SECOND_OPTION))
+        self.__submit_test((Question.FIRST_OPTION, Question.FIRST_OPTION, Question.SECOND_OPTION))
+        entries = LeaderboardEntry.objects.values_list('attempt_count', 'best_score', 'best_at')
+        incremental = list(entries)
+
+        rebuild_score_summaries()
+
+        self.assertEqual(incremental, list(entries.all()))
+        response = self.client.get(reverse('test leaderboard', kwargs={'pk_test': self.test.pk}))
+        self.assertEqual([66], [x.best_score for x in response.context['entries']])
+
+
+class CatalogCacheTests(django_test.TestCase):
+    VALID_USER_CREDENTIALS = {
+        'username': 'testuser',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        cache.clear()
+        UserModel.objects.create_user(**self.VALID_USER_CREDENTIALS)
+        self.category = create_category()
+        self.client.login(**self.VALID_USER_CREDENTIALS)
+
+    def test_list_categories__when_requested_twice__expect_second_response_from_cache(self):
+        self.client.get(reverse('list categories'))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('list categories'))
+
+        self.assertContains(response, self.category.title)
+
+    def test_list_categories__when_category_changed__expect_fresh_response(self):
+        self.client.get(reverse('list categories'))
+        self.category.title = 'Mathematics'
+        self.category.save()
+
+        response = self.client.get(reverse('list categories'))
+
+        self.assertContains(response, 'Mathematics')
+
+    def test_list_categories__when_more_than_one_page__expect_keyset_cursors(self):
+        page_size = CategoryListView.paginate_by
+        categories = [self.category] + [
+            Category.objects.create(title=f'Category {x}', picture='images/category/science.jpg')
+            for x in range(page_size)
+        ]
+
+        first_page = self.client.get(reverse('list categories'))
+        second_page = self.client.get(reverse('list categories'), {'after': first_page.context['next_cursor']})
+        previous_page = self.client.get(reverse('list categories'), {'before': second_page.context['previous_cursor']})
+
+        self.assertEqual(categories[:page_size], list(first_page.context['categories_list']))
+        self.assertEqual(categories[page_size:], list(second_page.context['categories_list']))
+        self.assertIsNone(second_page.context['next_cursor'])
+        self.assertEqual(categories[:page_size], list(previous_page.context['categories_list']))
+        self.assertIsNone(previous_page.context['previous_cursor'])
+
+    def test_list_courses__when_rendered__expect_description_excerpt_without_full_description(self):
+        user = UserModel.objects.get(username=self.VALID_USER_CREDENTIALS['username'])
+        description = 'Long description. ' * 50
+        course = create_course(user, self.category, description=description)
+
+        response = self.client.get(reverse('list courses', kwargs={'pk': self.category.pk}))
+
+        self.assertContains(response, course.description_excerpt)
+        self.assertNotContains(response, description)
+        self.assertIn('description', response.context['courses_list'][0].get_deferred_fields())
+
+
+class OwnershipTests(django_test.TestCase):
+    OWNER_CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    OTHER_USER_CREDENTIALS = {
+        'username': 'other',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        owner = UserModel.objects.create_user(**self.OWNER_CREDENTIALS)
+        UserModel.objects.create_user(**self.OTHER_USER_CREDENTIALS)
+        course = create_course(owner)
+        test = Test.objects.create(title='Basics', course=course)
+        self.question = Question.objects.create(
+            title='Question',
+            test=test,
+            first_option='First',
+            second_option='Second',
+            third_option='Third',
+            fourth_option='Fourth',
+            correct_answer=Question.FIRST_OPTION,
+        )
+
+    def test_edit_question__when_owner__expect_single_query_for_ownership_chain(self):
+        self.client.login(**self.OWNER_CREDENTIALS)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('edit question', kwargs={'pk': self.question.pk}))
+
+        self.assertTrue(response.context['is_owner'])
+
+    def test_delete_question__when_not_owner__expect_forbidden(self):
+        self.client.login(**self.OTHER_USER_CREDENTIALS)
+
+        response = self.client.post(reverse('delete question', kwargs={'pk': self.question.pk}))
+
+        self.assertEqual(403, response.status_code)
+        self.assertTrue(Question.objects.filter(pk=self.question.pk).exists())
+
+
+class InstrumentationTests(django_test.TestCase):
+    STAFF_CREDENTIALS = {
+        'username': 'staff',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        UserModel.objects.create_user(**self.STAFF_CREDENTIALS, is_staff=True)
+        self.client.login(**self.STAFF_CREDENTIALS)
+
+    def test_response__when_view_queries_database__expect_server_timing_header(self):
+        response = self.client.get(reverse('list categories'))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+
+    def test_instrumentation_stats__when_staff__expect_percentiles_per_url_name(self):
+        self.client.get(reverse('list categories'))
+
+        response = self.client.get(reverse('instrumentation stats'))
+
+        stats = response.json()['views']['list categories']
+        self.assertEqual(1, stats['requests'])
+        self.assertIn('p99', stats['total_ms'])
+
+    def test_response__when_function_view_renders_template__expect_template_time_recorded(self):
+        self.client.get(reverse('search'), {'q': 'physics'})
+
+        self.assertGreater(metrics.summary()['search']['template_ms']['p50'], 0)
+
+    def test_response__when_user_not_staff__expect_no_server_timing_header(self):
+        UserModel.objects.create_user(username='student', password=self.STAFF_CREDENTIALS['password'])
+        self.client.login(username='student', password=self.STAFF_CREDENTIALS['password'])
+
+        response = self.client.get(reverse('list categories'))
+
+        self.assertNotIn('Server-Timing', response)
+
+
+class ImageDerivativeTests(django_test.TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @staticmethod
+    def __create_image(width, height):
+        content = io.BytesIO()
+        Image.new('RGB', (width, height)).save(content, 'JPEG')
+        return SimpleUploadedFile('picture.jpg', content.getvalue(), content_type='image/jpeg')
+
+    def test_category_create__when_picture_uploaded__expect_derivatives_generated(self):
+        category = create_category(picture=self.__create_image(1200, 800))
+        job = Job.objects.get(name='images.generate_derivatives')
+
+        self.assertEqual(Job.SUCCEEDED, run_job(job.pk))
+
+        storage = category.picture.storage
+        self.assertTrue(all(storage.exists(name) for name in derivative_names(category.picture.name)))
+        rendered = Template('{% load media_tags %}{% responsive_image category.picture %}').render(
+            Context({'category': category}))
+        self.assertIn(f'_w{DERIVATIVE_WIDTHS[0]}.webp {DERIVATIVE_WIDTHS[0]}w', rendered)
+
+    def test_responsive_image__when_original_narrower_than_derivatives__expect_real_widths_in_srcset(self):
+        category = create_category(picture=self.__create_image(500, 300))
+        run_job(Job.objects.get(name='images.generate_derivatives').pk)
+
+        rendered = Template('{% load media_tags %}{{ category.picture|srcset }}').render(
+            Context({'category': category}))
+
+        self.assertIn('_w320.webp 320w', rendered)
+        self.assertIn('_w640.webp 500w', rendered)
+        self.assertNotIn('_w960', rendered)
+
+
+class JobQueueTests(django_test.TestCase):
+    def test_run_job__when_handler_fails__expect_retry_with_backoff(self):
+        job = enqueue('images.generate_derivatives', model='main.Category', pk=0, field='picture')
+        Job.objects.filter(pk=job.pk).update(name='unknown')
+
+        claimed = claim_jobs(1)
+        status = run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual([job.pk], claimed)
+        self.assertEqual(Job.PENDING, status)
+        self.assertEqual(1, job.attempts)
+        self.assertGreater(job.run_after, job.created_at)
+        self.assertEqual([], claim_jobs(1))
+
+    def test_run_jobs__when_worker_process_fails__expect_job_retried(self):
+        job = enqueue('images.generate_derivatives', model='main.Category', pk=0, field='picture')
+        claim_jobs(1)
+        future = Future()
+        future.set_exception(BrokenProcessPool('worker died'))
+
+        run_jobs.Command(stdout=io.StringIO(), stderr=io.StringIO()).finish_job(job.pk, future)
+
+        job.refresh_from_db()
+        self.assertEqual(Job.PENDING, job.status)
+        self.assertIn('worker died', job.last_error)
+
+
+class JobHeartbeatTests(django_test.TransactionTestCase):
+    def test_heartbeat__when_job_runs_longer_than_interval__expect_updated_at_refreshed(self):
+        job = enqueue('images.generate_derivatives', model='main.Category', pk=0, field='picture')
+        claim_jobs(1)
+        stale = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(pk=job.pk).update(updated_at=stale)
+
+        with Heartbeat(job.pk, interval=0.05):
+            time.sleep(0.3)
+
+        job.refresh_from_db()
+        self.assertGreater(job.updated_at, stale)
+        self.assertEqual([], claim_jobs(1))
+
+
+class MediaServingTests(django_test.TestCase):
+    CONTENT = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        with open(os.path.join(self.media_root, 'video.mp4'), 'wb') as file:
+            file.write(self.CONTENT)
+        self.url = reverse('serve media', kwargs={'path': 'video.mp4'})
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_serve_media__when_range_requested__expect_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(f'bytes 100-199/{len(self.CONTENT)}', response['Content-Range'])
+        self.assertEqual(self.CONTENT[100:200], b''.join(response.streaming_content))
+
+    def test_serve_media__when_suffix_range_requested__expect_file_tail(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+
+        self.assertEqual(self.CONTENT[-10:], b''.join(response.streaming_content))
+
+    def test_serve_media__when_range_unsatisfiable__expect_416(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.CONTENT)}-')
+
+        self.assertEqual(416, response.status_code)
+
+    def test_serve_media__when_etag_matches__expect_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+
+class ChunkedUploadTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    CONTENT = b'\x00\x00\x00\x18ftypmp42' + bytes(range(256)) * 10
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        user = UserModel.objects.create_user(**self.CREDENTIALS)
+        self.course = create_course(user)
+        self.client.login(**self.CREDENTIALS)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def __create_upload(self, filename, size):
+        return self.client.post(reverse('create upload', kwargs={'pk': self.course.pk, 'field': 'video'}), {
+            'filename': filename,
+            'size': size,
+        })
+
+    def __put_chunk(self, url, start, chunk):
+        return self.client.put(url, chunk, content_type='application/octet-stream',
+                               HTTP_CONTENT_RANGE=f'bytes {start}-{start + len(chunk) - 1}/{len(self.CONTENT)}')
+
+    def test_upload_chunk__when_all_chunks_sent__expect_course_video_replaced(self):
+        url = self.__create_upload('lecture.mp4', len(self.CONTENT)).json()['url']
+        middle = len(self.CONTENT) // 2
+
+        self.__put_chunk(url, 0, self.CONTENT[:middle])
+        response = self.__put_chunk(url, middle, self.CONTENT[middle:])
+
+        self.assertTrue(response.json()['is_complete'])
+        self.course.refresh_from_db()
+        with self.course.video.open('rb') as file:
+            self.assertEqual(self.CONTENT, file.read())
+        self.assertTrue(Job.objects.filter(name='videos.transcode', payload__pk=self.course.pk).exists())
+
+    def test_upload_chunk__when_magic_bytes_do_not_match__expect_rejected_on_first_chunk(self):
+        url = self.__create_upload('lecture.mp4', len(self.CONTENT)).json()['url']
+
+        response = self.__put_chunk(url, 0, b'%PDF-' + self.CONTENT[5:100])
+
+        self.assertEqual(400, response.status_code)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_create_upload__when_extension_not_allowed__expect_bad_request(self):
+        response = self.__create_upload('lecture.exe', len(self.CONTENT))
+
+        self.assertEqual(400, response.status_code)
+
+    def test_write_chunk__when_stream_returns_short_reads__expect_full_signature_checked(self):
+        upload_session = UploadSession.objects.create(
+            course=self.course, field='video', filename='lecture.mp4', size=len(self.CONTENT))
+        class ShortReadStream(io.BytesIO):
+            def read(self, size=-1):
+                return super().read(min(size, 3))
+
+        written = write_chunk(upload_session, 0, ShortReadStream(self.CONTENT), len(self.CONTENT))
+
+        self.assertEqual(len(self.CONTENT), written)
+        with open(upload_session.temporary_path, 'rb') as file:
+            self.assertEqual(self.CONTENT, file.read())
+
+    def test_upload_chunk__when_finalize_fails__expect_assembled_file_removed(self):
+        url = self.__create_upload('lecture.mp4', len(self.CONTENT)).json()['url']
+
+        with mock.patch('gain_knowledge.main.uploads.enqueue_transcoding', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.__put_chunk(url, 0, self.CONTENT)
+
+        self.course.refresh_from_db()
+        self.assertEqual('videos/physics.mp4', self.course.video.name)
+        self.assertFalse(default_storage.exists(blob_name(hashlib.sha256(self.CONTENT).hexdigest(), 'lecture.mp4')))
+
+    def test_expire_uploads__when_session_abandoned__expect_session_and_partial_files_removed(self):
+        stale = UploadSession.objects.create(course=self.course, field='video', filename='old.mp4', size=100)
+        fresh = UploadSession.objects.create(course=self.course, field='video', filename='new.mp4', size=100)
+        UploadSession.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=2))
+        orphan_path = os.path.join(os.path.dirname(stale.temporary_path), 'orphan.part')
+        for path in (stale.temporary_path, fresh.temporary_path, orphan_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(self.CONTENT[:100])
+        old_time = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orphan_path, (old_time, old_time))
+
+        call_command('expire_uploads', stdout=io.StringIO())
+
+        self.assertEqual([fresh.pk], list(UploadSession.objects.values_list('pk', flat=True)))
+        self.assertEqual([os.path.basename(fresh.temporary_path)],
+                         os.listdir(os.path.dirname(fresh.temporary_path)))
+
+
+class VideoTranscodingTests(django_test.TestCase):
+    def setUp(self):
+        user = UserModel.objects.create_user(username='owner', password='12345qew')
+        self.course = create_course(user, video='videos/physics.mkv')
+
+    def test_course_details__when_renditions_exist__expect_hls_then_default_height_sources(self):
+        for kind, height in ((VideoRendition.MP4, 360), (VideoRendition.MP4, 720), (VideoRendition.WEBM, 1080)):
+            VideoRendition.objects.create(course=self.course, kind=kind, height=height, file=f'r/{height}p.{kind}')
+        VideoRendition.objects.create(course=self.course, kind=VideoRendition.HLS, file='r/master.m3u8')
+        self.client.login(username='owner', password='12345qew')
+
+        response = self.client.get(reverse('courses details', kwargs={'pk': self.course.pk}))
+
+        self.assertEqual([
+            ('/media/r/master.m3u8', 'application/vnd.apple.mpegurl'),
+            ('/media/r/1080p.webm', 'video/webm'),
+            ('/media/r/720p.mp4', 'video/mp4'),
+            ('/media/videos/physics.mkv', 'video/x-matroska'),
+        ], response.context['video_sources'])
+
+    def test_course_save__when_video_replaced__expect_stale_renditions_removed(self):
+        VideoRendition.objects.create(course=self.course, kind=VideoRendition.HLS, file='r/master.m3u8')
+        course = Course.objects.get(pk=self.course.pk)
+
+        course.title = 'Mechanics'
+        course.save()
+        self.assertTrue(VideoRendition.objects.filter(course=course).exists())
+
+        course.video = 'videos/mechanics.mp4'
+        course.save()
+        self.assertFalse(VideoRendition.objects.filter(course=course).exists())
+
+    @django_test.override_settings(FFPROBE_BINARY='missing-ffprobe-binary')
+    def test_transcode_job__when_ffmpeg_missing__expect_retry(self):
+        job = enqueue('videos.transcode', pk=self.course.pk, video=self.course.video.name)
+
+        status = run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(Job.PENDING, status)
+        self.assertIn('missing-ffprobe-binary', job.last_error)
+        self.assertFalse(VideoRendition.objects.exists())
+
+
+class ContentAddressedStorageTests(django_test.TestCase):
+    CONTENT = b'%PDF-1.4 lecture notes'
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = UserModel.objects.create_user(username='owner', password='12345qew')
+        self.category = create_category()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def __create_course(self, title, document_content):
+        return create_course(self.user, self.category, title=title, description=f'{title} course',
+                             document=SimpleUploadedFile('notes.pdf', document_content))
+
+    def test_course_create__when_same_document_uploaded_twice__expect_single_blob(self):
+        first = self.__create_course('Physics', self.CONTENT)
+        second = self.__create_course('Chemistry', self.CONTENT)
+
+        self.assertEqual(first.document.name, second.document.name)
+        self.assertTrue(first.document.name.startswith('blobs/'))
+        self.assertEqual(2, MediaBlob.objects.get(name=first.document.name).references)
+
+    def test_course_delete__when_last_reference_released__expect_blob_deleted(self):
+        first = self.__create_course('Physics', self.CONTENT)
+        second = self.__create_course('Chemistry', self.CONTENT)
+        name = first.document.name
+        storage = first.document.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.get(pk=second.pk).delete()
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_course_save__when_document_replaced__expect_previous_blob_released(self):
+        course = self.__create_course('Physics', self.CONTENT)
+        previous_name = course.document.name
+
+        course.document = SimpleUploadedFile('notes.pdf', b'%PDF-1.4 revised notes')
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+
+        self.assertFalse(course.document.storage.exists(previous_name))
+        self.assertEqual(1, MediaBlob.objects.get(name=course.document.name).references)
+
+    def test_storage_save__when_derivative_already_exists__expect_replaced_in_place(self):
+        course = self.__create_course('Physics', self.CONTENT)
+        storage = course.document.storage
+        name = derivative_name(course.document.name, DERIVATIVE_WIDTHS[0], 'jpg')
+        storage.save(name, ContentFile(b'first'))
+
+        self.assertEqual(name, storage.save(name, ContentFile(b'second')))
+
+        with storage.open(name, 'rb') as file:
+            self.assertEqual(b'second', file.read())
+        self.assertFalse([x for x in os.listdir(os.path.dirname(storage.path(name))) if x.endswith('.part')])
+
+
+class DocumentPreviewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        self.cache_location = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(DOCUMENT_PAGE_CACHE_LOCATION=self.cache_location)
+        self.settings_override.enable()
+        user = UserModel.objects.create_user(**self.CREDENTIALS)
+        self.course = create_course(user)
+        preview = DocumentPreview.objects.create(
+            document=self.course.document.name,
+            page_count=2,
+            thumbnail='documents/physics_thumbnail.png',
+        )
+        DocumentPage.objects.bulk_create([
+            DocumentPage(preview=preview, number=1, text='Newton laws'),
+            DocumentPage(preview=preview, number=2, text='Thermodynamics'),
+        ])
+        self.client.login(**self.CREDENTIALS)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_location, ignore_errors=True)
+
+    def test_document_preview__when_page_exists__expect_page_text_and_navigation(self):
+        response = self.client.get(reverse('document preview', kwargs={'pk': self.course.pk, 'number': 2}))
+
+        self.assertContains(response, 'Thermodynamics')
+        self.assertEqual(1, response.context['previous_page'])
+        self.assertIsNone(response.context['next_page'])
+
+    def test_document_preview__when_page_out_of_range__expect_404(self):
+        response = self.client.get(reverse('document preview', kwargs={'pk': self.course.pk, 'number': 3}))
+
+        self.assertEqual(404, response.status_code)
+
+    def test_document_page_image__when_page_cached__expect_served_from_cache(self):
+        path = page_cache_path(self.course.document.name, 1)
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file:
+            file.write(b'page')
+
+        response = self.client.get(reverse('document page image', kwargs={'pk': self.course.pk, 'number': 1}))
+
+        self.assertEqual(b'page', b''.join(response.streaming_content))
+        self.assertEqual('image/png', response['Content-Type'])
+
+    def test_evict_page_cache__when_over_max_size__expect_least_recently_used_removed(self):
+        now = time.time()
+        paths = [os.path.join(self.cache_location, f'{number}.png') for number in range(3)]
+        for age, path in zip((30, 10, 20), paths):
+            with open(path, 'wb') as file:
+                file.write(b'x' * 10)
+            os.utime(path, (now - age, now - age))
+
+        evict_page_cache(self.cache_location, 20)
+
+        self.assertEqual([False, True, True], [os.path.exists(path) for path in paths])
+
+
+@django_test.override_settings(SEARCH_RESULTS_PER_PAGE=2)
+class SearchTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        inverted_index.clear()
+        self.user = UserModel.objects.create_user(**self.CREDENTIALS)
+        self.category = create_category()
+        self.client.login(**self.CREDENTIALS)
+
+    def __create_course(self, title, description):
+        return create_course(self.user, self.category, title=title, description=description)
+
+    def __search(self, query, page=1):
+        return self.client.get(reverse('search'), {'q': query, 'page': page})
+
+    def test_search__when_term_in_title_and_description__expect_title_match_ranked_first(self):
+        chemistry = self.__create_course('Chemistry', 'Reactions explained with quantum models')
+        quantum = self.__create_course('Quantum', 'Introduction to physics')
+
+        response = self.__search('quantum')
+
+        self.assertEqual([quantum.pk, chemistry.pk], [x.object_id for x in response.context['results']])
+
+    def test_search__when_question_matches_option__expect_question_result(self):
+        course = self.__create_course('Physics', 'Introduction to physics')
+        test = Test.objects.create(title='Basics', course=course)
+        question = Question.objects.create(title='Unit of force?', test=test, first_option='Newton',
+                                           second_option='Joule', third_option='Watt', fourth_option='Pascal',
+                                           correct_answer=Question.FIRST_OPTION)
+
+        response = self.__search('newton')
+
+        self.assertEqual([(SearchDocument.QUESTION, question.pk)],
+                         [(x.kind, x.object_id) for x in response.context['results']])
+
+    def test_search__when_course_deleted__expect_removed_from_results(self):
+        course = self.__create_course('Astronomy', 'Stars and planets')
+        self.__search('stars')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            course.delete()
+
+        self.assertEqual([], self.__search('stars').context['results'])
+
+    def test_search__when_course_deleted_in_another_process__expect_index_reloaded(self):
+        course = self.__create_course('Astronomy', 'Stars and planets')
+        other_process_index = InvertedIndex()
+        other_process_index.refresh()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            course.delete()
+        other_process_index.refresh()
+
+        self.assertEqual([], other_process_index.search('stars'))
+
+    def test_search__when_more_results_than_page__expect_next_page(self):
+        for number in range(3):
+            self.__create_course(f'Biology {number}', 'Cells')
+
+        first_page = self.__search('cells')
+        last_page = self.__search('cells', 2)
+
+        self.assertEqual(2, first_page.context['next_page'])
+        self.assertEqual(1, len(last_page.context['results']))
+        self.assertIsNone(last_page.context['next_page'])
+
+
+class QuestionBankTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    VALID_ROW = {
+        'title': 'Unit of force?',
+        'first_option': 'Newton',
+        'second_option': 'Joule',
+        'third_option': 'Watt',
+        'fourth_option': 'Pascal',
+        'correct_answer': 'A',
+    }
+
+    def setUp(self):
+        user = UserModel.objects.create_user(**self.CREDENTIALS)
+        course = create_course(user)
+        self.test = Test.objects.create(title='Basics', course=course)
+        self.client.login(**self.CREDENTIALS)
+
+    def __import(self, name, content):
+        return self.client.post(reverse('import questions', kwargs={'pk': self.test.pk}), {
+            'file': SimpleUploadedFile(name, content.encode()),
+        })
+
+    def test_import_questions__when_jsonl_has_invalid_rows__expect_valid_rows_created_and_errors_reported(self):
+        content = '\n'.join((
+            json.dumps(self.VALID_ROW),
+            json.dumps({**self.VALID_ROW, 'correct_answer': 'E'}),
+            '{not json',
+            json.dumps({**self.VALID_ROW, 'title': 'Unit of energy?'}),
+        ))
+
+        response = self.__import('bank.jsonl', content)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(2, response.json()['created'])
+        self.assertEqual([2, 3], [x['row'] for x in response.json()['errors']])
+        self.assertEqual([1, 2], list(Question.objects.filter(test=self.test).values_list('position', flat=True)))
+        self.assertTrue(SearchDocument.objects.filter(kind=SearchDocument.QUESTION, title='Unit of energy?').exists())
+
+    def test_import_questions__when_json_array_split_across_chunks__expect_all_rows_created(self):
+        rows = [{**self.VALID_ROW, 'title': f'Question {x}'} for x in range(3)]
+
+        result = question_bank.import_questions(
+            self.test.pk, question_bank.iter_json_array(io.StringIO(json.dumps(rows)), chunk_size=7))
+
+        self.assertEqual((3, 0), (result.created, result.failed))
+
+    def test_export_questions__when_csv__expect_streamed_rows_in_position_order(self):
+        self.__import('bank.csv', 'title,first_option,second_option,third_option,fourth_option,correct_answer\r\n'
+                                  'Second?,a,b,c,d,B\r\nFirst?,a,b,c,d,A\r\n')
+        Question.reorder(self.test.pk, list(Question.objects.order_by('-position').values_list('id', flat=True)))
+
+        response = self.client.get(reverse('export questions', kwargs={'pk': self.test.pk, 'file_format': 'csv'}))
+
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(['First?', 'Second?'], [line.split(',')[0] for line in lines[1:]])
+
+
+class CourseTreeTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = UserModel.objects.create_user(**self.CREDENTIALS)
+        self.category = create_category()
+        self.course = create_course(
+            self.user,
+            self.category,
+            picture=SimpleUploadedFile('physics.jpg', b'picture'),
+            video=SimpleUploadedFile('physics.mp4', b'video'),
+            document=SimpleUploadedFile('physics.pdf', b'%PDF-1.4 notes'),
+        )
+        for test_title in ('Basics', 'Advanced'):
+            test = Test.objects.create(title=test_title, course=self.course)
+            for title in ('First?', 'Second?'):
+                Question.objects.create(title=f'{test_title} {title}', first_option='a', second_option='b',
+                                        third_option='c', fourth_option='d', correct_answer='A', test=test)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def __questions(self, course):
+        return list(Question.objects.filter(test__course=course).order_by('test_id', 'position')
+                    .values_list('test__title', 'title', 'position'))
+
+    def test_clone_course__expect_tests_and_questions_copied_and_media_shared(self):
+        clone = clone_course(self.course, self.user)
+
+        self.assertEqual('Physics (copy)', clone.title)
+        self.assertEqual(self.__questions(self.course), self.__questions(clone))
+        self.assertEqual(self.course.document.name, clone.document.name)
+        self.assertEqual(2, MediaBlob.objects.get(name=clone.document.name).references)
+        self.assertEqual(4, SearchDocument.objects.filter(kind=SearchDocument.QUESTION, course=clone).count())
+
+    def test_clone_course__when_not_owner__expect_forbidden(self):
+        UserModel.objects.create_user(username='other', password='12345qew')
+        self.client.login(username='other', password='12345qew')
+
+        response = self.client.post(reverse('clone course', kwargs={'pk': self.course.pk}))
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual(1, Course.objects.count())
+
+    def test_import_course__when_manifest_key_missing__expect_form_error(self):
+        archive = io.BytesIO()
+        export_course(self.course, archive, include_media=False)
+        with zipfile.ZipFile(archive) as source:
+            manifest = json.loads(source.read('course.json'))
+        del manifest['tests'][0]['questions']
+        malformed = io.BytesIO()
+        with zipfile.ZipFile(malformed, 'w') as target:
+            target.writestr('course.json', json.dumps(manifest))
+        self.client.login(**self.CREDENTIALS)
+
+        response = self.client.post(reverse('import course'), {
+            'archive': SimpleUploadedFile('course.zip', malformed.getvalue()),
+            'category': self.category.pk,
+        })
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn('malformed', response.context['form'].errors['archive'][0])
+        self.assertEqual(1, Course.objects.count())
+
+    def test_import_course__when_exported_archive__expect_same_course_tree(self):
+        archive = io.BytesIO()
+        export_course(self.course, archive)
+        archive.seek(0)
+
+        imported = import_course(archive, self.user, self.category)
+
+        self.assertEqual(self.__questions(self.course), self.__questions(imported))
+        self.assertEqual(self.course.video.name, imported.video.name)
+        self.assertEqual(2, MediaBlob.objects.get(name=imported.video.name).references)
+
+
+class QuestionAnalyticsTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'owner',
+        'password': '12345qew',
+    }
+
+    def setUp(self):
+        self.user = UserModel.objects.create_user(**self.CREDENTIALS)
+        course = create_course(self.user)
+        self.test = Test.objects.create(title='Basics', course=course)
+        self.easy, self.hard = (
+            Question.objects.create(title=title, first_option='a', second_option='b', third_option='c',
+                                    fourth_option='d', correct_answer=Question.FIRST_OPTION, test=self.test)
+            for title in ('Easy?', 'Hard?')
+        )
+        self.client.login(**self.CREDENTIALS)
+
+    def __create_attempt(self, answers, finished=True):
+        attempt = TestAttempt.objects.create(user=self.user, test=self.test,
+                                             finished_at=timezone.now() if finished else None)
+        AnswerRecord.objects.bulk_create(
+            AnswerRecord(attempt=attempt, question=question, answer=answer,
+                         is_correct=answer == question.correct_answer)
+            for question, answer in zip((self.easy, self.hard), answers)
+        )
+
+    def test_compute_question_statistics__when_chunked__expect_p_values_discrimination_and_option_rates(self):
+        self.__create_attempt(('A', 'A'))
+        self.__create_attempt(('A', 'A'))
+        self.__create_attempt(('A', 'B'))
+        self.__create_attempt(('B', 'C'))
+        self.__create_attempt(('B', 'B'), finished=False)
+
+        self.assertEqual(2, compute_question_statistics(chunk_size=3))
+
+        easy = QuestionStatistics.objects.get(question=self.easy)
+        hard = QuestionStatistics.objects.get(question=self.hard)
+        self.assertEqual((4, 0.75), (easy.response_count, easy.p_value))
+        self.assertEqual([('A', 0.5), ('B', 0.25), ('C', 0.25), ('D', 0)], hard.option_rates)
+        self.assertEqual(1, hard.discrimination)
+
+    def test_list_questions__when_statistics_computed__expect_rates_without_analytics_queries(self):
+        self.__create_attempt(('A', 'B'))
+        compute_question_statistics()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user list questions', kwargs={'pk': self.test.pk}))
+
+        self.assertContains(response, 'B: 100%')
+        self.assertFalse([x for x in queries if 'main_answerrecord' in x['sql']])
+
+
+class SeededCommandTests(django_test.TestCase):
+    SEED_OPTIONS = {
+        'categories': 2,
+        'courses': 3,
+        'tests': 2,
+        'questions_min': 2,
+        'questions_max': 3,
+        'users': 2,
+    }
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = django_test.override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @staticmethod
+    def __on_test_database(command):
+        # The commands normally seed a database of their own; run them inside the test database instead
+        return mock.patch(f'gain_knowledge.main.management.commands.{command}.throwaway_database',
+                          lambda keepdb: contextlib.nullcontext())
+
+    def test_benchmark__when_run_on_seeded_data__expect_every_scenario_reported(self):
+        output = os.path.join(self.media_root, 'report.json')
+
+        with self.__on_test_database('benchmark'):
+            call_command('benchmark', iterations=2, output=output, stdout=io.StringIO(), **self.SEED_OPTIONS)
+
+        with open(output) as file:
+            scenarios = json.load(file)['scenarios']
+        self.assertIn('display test (submit)', scenarios)
+        self.assertIn('final score', scenarios)
+        self.assertTrue(TestAttempt.objects.filter(finished_at__isnull=False).exists())
+
+    def test_explain_queries__when_run_on_seeded_data__expect_views_explained(self):
+        stdout = io.StringIO()
+
+        with self.__on_test_database('explain_queries'):
+            call_command('explain_queries', stdout=stdout, **self.SEED_OPTIONS)
+
+        self.assertIn('display test:', stdout.getvalue())
+        self.assertIn('Flagged sequential scans:', stdout.getvalue())
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite reports ordered full reads as scans')
+    def test_sequential_scans__when_sqlite_scans_table__expect_only_filtered_tables_flagged(self):
+        filtered_sql = str(Question.objects.filter(title=F('first_option')).query)
+        unfiltered_sql = str(Category.objects.order_by('id').query)
+        command = explain_queries.Command()
+
+        filtered = list(command.sequential_scans(command.explain(filtered_sql), filtered_sql))
+        unfiltered = list(command.sequential_scans(command.explain(unfiltered_sql), unfiltered_sql))
+
+        self.assertEqual(['main_question'], filtered)
+        self.assertEqual([], unfiltered)
 
-# Create your tests here.
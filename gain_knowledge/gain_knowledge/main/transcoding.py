@@ -0,0 +1,161 @@
+import json
+import mimetypes
+import os
+import shutil
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from gain_knowledge.common.cache import bump_version
+from gain_knowledge.common.external import find_binary, run
+from gain_knowledge.jobs.queue import enqueue
+from gain_knowledge.main.models import Course, VideoRendition
+
+RENDITION_PROFILES = (
+    (360, 800),
+    (720, 2500),
+    (1080, 5000),
+)
+AUDIO_BITRATE_KBPS = 128
+HLS_SEGMENT_SECONDS = 6
+RENDITIONS_DIR = 'videos/renditions'
+
+CODEC_ARGUMENTS = {
+    VideoRendition.MP4: ('-c:v', 'libx264', '-preset', 'veryfast', '-c:a', 'aac', '-movflags', '+faststart'),
+    VideoRendition.WEBM: ('-c:v', 'libvpx-vp9', '-deadline', 'realtime', '-cpu-used', '5', '-c:a', 'libopus'),
+}
+
+
+def probe_dimensions(source):
+    output = run((
+        find_binary(settings.FFPROBE_BINARY), '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height', '-of', 'json', source,
+    ))
+    stream = json.loads(output)['streams'][0]
+    return stream['width'], stream['height']
+
+
+def select_profiles(source_height):
+    profiles = [(height, bitrate) for height, bitrate in RENDITION_PROFILES if height <= source_height]
+    return profiles or [RENDITION_PROFILES[0]]
+
+
+def build_transcode_arguments(source, target, kind, height, bitrate_kbps):
+    return (
+        find_binary(settings.FFMPEG_BINARY), '-y', '-v', 'error', '-i', source,
+        '-vf', f'scale=-2:{height}',
+        '-b:v', f'{bitrate_kbps}k', '-maxrate', f'{bitrate_kbps}k', '-bufsize', f'{bitrate_kbps * 2}k',
+        *CODEC_ARGUMENTS[kind],
+        '-b:a', f'{AUDIO_BITRATE_KBPS}k',
+        target,
+    )
+
+
+def build_hls_arguments(source, playlist, segment_pattern):
+    return (
+        find_binary(settings.FFMPEG_BINARY), '-y', '-v', 'error', '-i', source,
+        '-c', 'copy', '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', segment_pattern,
+        playlist,
+    )
+
+
+def build_master_playlist(variants):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for playlist_name, width, height, bitrate_kbps in variants:
+        bandwidth = (bitrate_kbps + AUDIO_BITRATE_KBPS) * 1000
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}')
+        lines.append(playlist_name)
+    return '\n'.join(lines) + '\n'
+
+
+def scaled_width(source_width, source_height, height):
+    width = round(source_width * height / source_height)
+    return width + width % 2
+
+
+def renditions_directory(video_name):
+    return f'{RENDITIONS_DIR}/{sha1(video_name.encode()).hexdigest()[:16]}'
+
+
+def replace_renditions(course, renditions):
+    with transaction.atomic():
+        VideoRendition.objects.filter(course=course).delete()
+        VideoRendition.objects.bulk_create(renditions)
+        transaction.on_commit(lambda: bump_version(Course))
+
+
+def clear_renditions(course):
+    VideoRendition.objects.filter(course=course).delete()
+    transaction.on_commit(lambda: bump_version(Course))
+
+
+def transcode_course_video(course):
+    shared = VideoRendition.objects.filter(course__video=course.video.name).exclude(course=course)
+    shared_course_id = shared.values_list('course_id', flat=True).first()
+    if shared_course_id is not None:
+        replace_renditions(course, [
+            VideoRendition(course=course, kind=x.kind, height=x.height, bitrate_kbps=x.bitrate_kbps, file=x.file.name)
+            for x in VideoRendition.objects.filter(course_id=shared_course_id)
+        ])
+        return
+
+    storage = course.video.storage
+    source = storage.path(course.video.name)
+    source_width, source_height = probe_dimensions(source)
+
+    directory_name = renditions_directory(course.video.name)
+    directory = storage.path(directory_name)
+    os.makedirs(directory, exist_ok=True)
+
+    renditions = []
+    hls_variants = []
+    for height, bitrate_kbps in select_profiles(source_height):
+        for kind in (VideoRendition.MP4, VideoRendition.WEBM):
+            name = f'{height}p.{kind}'
+            run(build_transcode_arguments(source, os.path.join(directory, name), kind, height, bitrate_kbps))
+            renditions.append(VideoRendition(
+                course=course, kind=kind, height=height, bitrate_kbps=bitrate_kbps, file=f'{directory_name}/{name}',
+            ))
+
+        playlist_name = f'{height}p.m3u8'
+        run(build_hls_arguments(
+            os.path.join(directory, f'{height}p.mp4'),
+            os.path.join(directory, playlist_name),
+            os.path.join(directory, f'{height}p_%04d.ts'),
+        ))
+        hls_variants.append((playlist_name, scaled_width(source_width, source_height, height), height, bitrate_kbps))
+
+    with open(os.path.join(directory, 'master.m3u8'), 'w') as file:
+        file.write(build_master_playlist(hls_variants))
+    renditions.append(VideoRendition(course=course, kind=VideoRendition.HLS, file=f'{directory_name}/master.m3u8'))
+
+    replace_renditions(course, renditions)
+
+
+def delete_renditions(video_name):
+    shutil.rmtree(default_storage.path(renditions_directory(video_name)), ignore_errors=True)
+
+
+def enqueue_transcoding(course):
+    enqueue('videos.transcode', pk=course.pk, video=course.video.name)
+
+
+def get_video_sources(course, renditions):
+    by_kind = {}
+    for rendition in renditions:
+        by_kind.setdefault(rendition.kind, []).append(rendition)
+
+    sources = [(x.file.url, x.mime_type) for x in by_kind.get(VideoRendition.HLS, ())]
+    for kind in (VideoRendition.WEBM, VideoRendition.MP4):
+        candidates = sorted(by_kind.get(kind, ()), key=lambda x: x.height)
+        preferred = [x for x in candidates if x.height <= settings.VIDEO_DEFAULT_HEIGHT] or candidates[:1]
+        if preferred:
+            sources.append((preferred[-1].file.url, preferred[-1].mime_type))
+
+    if course.video:
+        mime_type, _ = mimetypes.guess_type(course.video.name)
+        sources.append((course.video.url, mime_type or 'video/mp4'))
+    return sources
@@ -0,0 +1,178 @@
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from gain_knowledge.main.blobs import delete_blob
+from gain_knowledge.main.documents import enqueue_preview
+from gain_knowledge.main.models import Course, UploadSession
+from gain_knowledge.main.transcoding import enqueue_transcoding
+
+UPLOAD_LIMITS = {
+    UploadSession.VIDEO: (Course.VIDEO_EXTENSIONS, Course.VIDEO_MAX_SIZE_IN_MB),
+    UploadSession.DOCUMENT: (Course.DOCUMENT_EXTENSIONS, Course.DOCUMENT_MAX_SIZE_IN_MB),
+}
+
+MAGIC_BYTES_LENGTH = 12
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+def is_iso_media(header):
+    return header[4:8] in (b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip')
+
+
+def is_matroska(header):
+    return header.startswith(b'\x1aE\xdf\xa3')
+
+
+MAGIC_BYTES_CHECKS = {
+    'mov': is_iso_media,
+    'mp4': is_iso_media,
+    'avi': lambda header: header.startswith(b'RIFF') and header[8:12] == b'AVI ',
+    'webm': is_matroska,
+    'mkv': is_matroska,
+    'pdf': lambda header: header.startswith(b'%PDF-'),
+}
+
+
+def get_extension(filename):
+    return os.path.splitext(filename)[1][1:].lower()
+
+
+def validate_upload(field, filename, size):
+    if field not in UPLOAD_LIMITS:
+        raise ValidationError(f'Unsupported upload field {field}')
+    extensions, max_size_in_mb = UPLOAD_LIMITS[field]
+    if get_extension(filename) not in (x.lower() for x in extensions):
+        raise ValidationError(f'Allowed extensions are: {", ".join(extensions)}')
+    if size <= 0 or size > max_size_in_mb * 1024 * 1024:
+        raise ValidationError(f'Max file size is {max_size_in_mb:.2f} MB')
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE_PATTERN.match(header or '')
+    if match is None:
+        raise ValidationError('Missing or invalid Content-Range header')
+    start, end, total = (int(x) for x in match.groups())
+    if total != size or end < start:
+        raise ValidationError('Content-Range does not match the upload')
+    return start, end - start + 1
+
+
+def discard(upload_session):
+    if os.path.exists(upload_session.temporary_path):
+        os.remove(upload_session.temporary_path)
+    upload_session.delete()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRY_SECONDS)
+
+
+def expire_uploads():
+    cutoff = expiry_cutoff()
+    expired = 0
+    for upload_session in UploadSession.objects.filter(created_at__lt=cutoff).iterator():
+        discard(upload_session)
+        expired += 1
+
+    # Chunks whose session row is already gone, e.g. after a course was deleted mid-upload
+    directory = os.path.join(settings.MEDIA_ROOT, settings.CHUNKED_UPLOAD_TEMP_DIR)
+    if os.path.isdir(directory):
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff.timestamp():
+                os.remove(entry.path)
+    return expired
+
+
+def read_header(stream, length):
+    header = b''
+    while len(header) < length:
+        data = stream.read(length - len(header))
+        if not data:
+            break
+        header += data
+    return header
+
+
+def validate_magic_bytes(filename, header):
+    if not MAGIC_BYTES_CHECKS[get_extension(filename)](header):
+        raise ValidationError('File content does not match its extension')
+
+
+class AssembledUpload(File):
+    def __init__(self, path, name):
+        super().__init__(open(path, 'rb'), name)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def write_chunk(upload_session, start, stream, length):
+    if start != upload_session.received:
+        raise ValidationError(f'Expected chunk starting at byte {upload_session.received}')
+    if start + length > upload_session.size:
+        raise ValidationError('Chunk exceeds the declared file size')
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise ValidationError('Chunk is too large')
+
+    header = b''
+    if start == 0:
+        # A single read may return fewer bytes than the signature needs, so keep reading until it is complete
+        header = read_header(stream, min(MAGIC_BYTES_LENGTH, length))
+        validate_magic_bytes(upload_session.filename, header)
+
+    path = upload_session.temporary_path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as file:
+        file.seek(start)
+        file.write(header)
+        written = len(header)
+        while written < length:
+            data = stream.read(min(settings.FILE_UPLOAD_MAX_MEMORY_SIZE, length - written))
+            if not data:
+                break
+            file.write(data)
+            written += len(data)
+        file.truncate(start + written)
+
+    updated = UploadSession.objects.filter(pk=upload_session.pk, received=start) \
+        .update(received=start + written)
+    if not updated:
+        raise ValidationError('Chunk was already received')
+    upload_session.received = start + written
+    return written
+
+
+def finalize(upload_session):
+    course = upload_session.course
+    field_file = getattr(course, upload_session.field)
+    upload = AssembledUpload(upload_session.temporary_path, upload_session.filename)
+    try:
+        name = field_file.field.generate_filename(course, upload_session.filename)
+        name = field_file.storage.save(name, upload, max_length=field_file.field.max_length)
+    finally:
+        upload.close()
+
+    try:
+        with transaction.atomic():
+            field_file.name = name
+            course.save(update_fields=(upload_session.field,))
+            UploadSession.objects.filter(pk=upload_session.pk).update(is_complete=True)
+            if upload_session.field == UploadSession.VIDEO:
+                enqueue_transcoding(course)
+            else:
+                enqueue_preview(course)
+    except Exception:
+        # Only removes the file if no other row references the same content
+        delete_blob(name)
+        raise
+    upload_session.is_complete = True
+    return field_file.name
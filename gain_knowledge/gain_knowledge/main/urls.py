@@ -3,27 +3,42 @@ from django.urls import path
 from gain_knowledge.main.views import CategoryListView, CourseDetailView, display_question, final_score, \
     HomeView, CoursesListView, TestsListView, CreateCourseView, UserCoursesListView, CourseEditView, CourseDeleteView, \
     UserTestsListView, CreateTestView, EditTestView, DeleteTestView, UserQuestionsListView, CreateQuestionView, \
-    DeleteQuestionView, EditQuestionView, QuestionDetailView
+    DeleteQuestionView, EditQuestionView, ReorderQuestionsView, QuestionDetailView, ImportQuestionsView, \
+    ExportQuestionsView, display_test, create_upload, upload_chunk, document_preview, document_page_image, \
+    search_results, CloneCourseView, ExportCourseView, ImportCourseView, test_leaderboard
 
 urlpatterns = [
     path('', HomeView.as_view(), name='index'),
     path('categories/', CategoryListView.as_view(), name='list categories'),
     path('categories/<int:pk>', CoursesListView.as_view(), name='list courses'),
     path('course/<int:pk>', CourseDetailView.as_view(), name='courses details'),
+    path('course/<int:pk>/document/<int:number>', document_preview, name='document preview'),
+    path('course/<int:pk>/document/<int:number>/image', document_page_image, name='document page image'),
     path('tests/<int:pk>', TestsListView.as_view(), name='list tests'),
     path('question/<int:pk_test>/<int:count_questions>', display_question, name='display question'),
-    path('final_score/<int:pk_test>', final_score, name='final score'),
+    path('test/<int:pk_test>', display_test, name='display test'),
+    path('final_score/<int:pk_test>/<int:pk_attempt>', final_score, name='final score'),
+    path('leaderboard/<int:pk_test>', test_leaderboard, name='test leaderboard'),
+    path('search/', search_results, name='search'),
     path('create_course/', CreateCourseView.as_view(), name='create course'),
     path('user_courses/', UserCoursesListView.as_view(), name='user list courses'),
     path('edit_course/<int:pk>', CourseEditView.as_view(), name='edit course'),
     path('delete_course/<int:pk>', CourseDeleteView.as_view(), name='delete course'),
+    path('clone_course/<int:pk>', CloneCourseView.as_view(), name='clone course'),
+    path('export_course/<int:pk>', ExportCourseView.as_view(), name='export course'),
+    path('import_course/', ImportCourseView.as_view(), name='import course'),
     path('user_tests/<int:pk>', UserTestsListView.as_view(), name='user list tests'),
     path('create_test/<int:pk>', CreateTestView.as_view(), name='create test'),
     path('edit_test/<int:pk>', EditTestView.as_view(), name='edit test'),
     path('delete_test/<int:pk>', DeleteTestView.as_view(), name='delete test'),
     path('user_questions/<int:pk>', UserQuestionsListView.as_view(), name='user list questions'),
+    path('reorder_questions/<int:pk>', ReorderQuestionsView.as_view(), name='reorder questions'),
+    path('import_questions/<int:pk>', ImportQuestionsView.as_view(), name='import questions'),
+    path('export_questions/<int:pk>/<str:file_format>', ExportQuestionsView.as_view(), name='export questions'),
     path('create_question/<int:pk>', CreateQuestionView.as_view(), name='create question'),
     path('delete_question/<int:pk>', DeleteQuestionView.as_view(), name='delete question'),
     path('edit_question/<int:pk>', EditQuestionView.as_view(), name='edit question'),
     path('show_question/<int:pk>', QuestionDetailView.as_view(), name='show question'),
+    path('upload/<int:pk>/<str:field>', create_upload, name='create upload'),
+    path('upload/<uuid:pk>', upload_chunk, name='upload chunk'),
 ]
\ No newline at end of file
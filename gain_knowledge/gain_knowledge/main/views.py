@@ -1,17 +1,35 @@
-from django import forms
+import tempfile
+
+from django.conf import settings
 from django.contrib.auth import mixins as auth_mixin
-from django.http import HttpResponseRedirect
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import HttpResponseRedirect, Http404, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse, \
+    FileResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.urls import reverse_lazy, reverse
 from django.views import generic as views
+from django.views.decorators.http import require_POST, require_http_methods, require_safe
 from django.views.generic import ListView, DetailView
 
-from gain_knowledge.accounts.models import CurrentResult
 from gain_knowledge.common.helper import BootstrapFormMixin, BootstrapRadioFormMixin
-from gain_knowledge.common.view_mixins import RedirectToCategories
+from gain_knowledge.common.media import serve_file
+from gain_knowledge.common.view_mixins import RedirectToCategories, CachedResponseMixin, KeysetPaginationMixin, \
+    FieldProjectionMixin, OwnerRequiredMixin
+from gain_knowledge.main import question_bank
+from gain_knowledge.main.answer_keys import AnswerKey
+from gain_knowledge.main.course_tree import clone_course, export_course, import_course, ArchiveError
+from gain_knowledge.main.documents import get_page_image
 from gain_knowledge.main.forms import CreateCourseForm, CreateTestForm, CreateQuestionForm, CourseEditForm, \
-    EditTestForm, EditQuestionForm
-from gain_knowledge.main.models import Category, Course, Test, Question
+    EditTestForm, EditQuestionForm, AnswerQuestionForm, AnswerQuestionFormSet, ImportCourseForm
+from gain_knowledge.main.models import Category, Course, Test, Question, TestAttempt, AnswerRecord, UploadSession, \
+    DocumentPreview, DocumentPage, TestScoreSummary, QuestionStatistics
+from gain_knowledge.main.quiz import QuizSession, new_seed
+from gain_knowledge.main.scores import leaderboard
+from gain_knowledge.main.search import search
+from gain_knowledge.main.transcoding import get_video_sources
+from gain_knowledge.main.uploads import validate_upload, parse_content_range, write_chunk, finalize, discard, \
+    expiry_cutoff
 
 
 
@@ -25,74 +43,105 @@ class HomeView(RedirectToCategories, views.TemplateView):
         return context
 
 
-class CategoryListView(ListView):
+class CategoryListView(CachedResponseMixin, KeysetPaginationMixin, ListView):
     model = Category
+    cache_dependencies = (Category,)
     template_name = 'main/list_categories.html'
     context_object_name = 'categories_list'
 
 
-class CoursesListView(ListView):
+class CoursesListView(CachedResponseMixin, FieldProjectionMixin, KeysetPaginationMixin, ListView):
     model = Course
+    cache_dependencies = (Category, Course)
+    only_fields = ('id', 'title', 'picture', 'description_excerpt')
     template_name = 'main/list_courses.html'
     context_object_name = 'courses_list'
 
     def get_queryset(self):
         category = get_object_or_404(Category, id=self.kwargs['pk'])
-        return Course.objects.filter(category=category)
+        return super().get_queryset().filter(category=category)
 
 
-class CourseDetailView(DetailView):
+class CourseDetailView(CachedResponseMixin, DetailView):
     model = Course
+    cache_dependencies = (Course,)
     template_name = 'main/course_details.html'
     context_object_name = 'course_detail'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['video_sources'] = get_video_sources(self.object, self.object.renditions.all())
+        context['document_preview'] = DocumentPreview.objects.filter(document=self.object.document.name).first()
+        return context
+
 
-class TestsListView(ListView):
+class TestsListView(CachedResponseMixin, FieldProjectionMixin, ListView):
     model = Test
+    cache_dependencies = (Course, Test)
+    only_fields = ('id', 'title')
     template_name = 'main/list_tests.html'
     context_object_name = 'tests_list'
 
     def get_queryset(self):
-        course = get_object_or_404(Course, id=self.kwargs['pk'])
-        return Test.objects.filter(course_id=course.id)
+        course = get_object_or_404(Course.objects.only('id'), id=self.kwargs['pk'])
+        return super().get_queryset().filter(course_id=course.id)
 
 
-def display_question(request, pk_test, count_questions):
+def get_quiz_test_or_404(pk_test):
+    return get_object_or_404(Test.objects.only('id', 'question_count', 'shuffle_options'), pk=pk_test)
 
-    question_objects = Question.objects.filter(test_id=pk_test)
 
-    if question_objects:
+def start_quiz(request, pk_test):
+    test = get_quiz_test_or_404(pk_test)
+    quiz = QuizSession.load(request.session, pk_test)
+    if quiz is not None and TestAttempt.objects.filter(
+            pk=quiz.attempt_id, user_id=request.user.id, finished_at__isnull=True).exists():
+        return quiz
 
-        question = question_objects[count_questions]
+    seed = new_seed()
+    steps = QuizSession.load_steps(test, seed)
+    if not steps:
+        return QuizSession(request.session, test.id, None, steps)
+    attempt = TestAttempt.objects.create(user=request.user, test_id=test.id, seed=seed, total_questions=len(steps))
+    AnswerKey.for_test(pk_test)
+    return QuizSession.start(request.session, test, attempt, steps)
 
-        options = [("A", question.first_option),
-                   ("B", question.second_option),
-                   ("C", question.third_option),
-                   ("D", question.fourth_option)]
 
-        class QuestionForm(forms.Form):
+@login_required
+def display_question(request, pk_test, count_questions):
+    if request.method == 'GET' and count_questions == 0:
+        quiz = start_quiz(request, pk_test)
+    else:
+        quiz = QuizSession.load(request.session, pk_test)
+        if quiz is None:
+            return redirect('display question', pk_test=pk_test, count_questions=0)
+
+    if quiz:
+        if count_questions >= len(quiz):
+            raise Http404
 
-            answer = forms.CharField(label=question.title,
-                                     widget=forms.RadioSelect(choices=options)
-                                     )
+        question = quiz.step(count_questions)
 
         if request.method == 'POST':
-            form = QuestionForm(request.POST)
-            current_result = CurrentResult.objects.get(user_id=request.user.id)
+            form = AnswerQuestionForm(question, request.POST)
             if form.is_valid():
-                if form.cleaned_data['answer'] == question.correct_answer:
-                    current_result.correct_answers += 1
-                else:
-                    current_result.incorrect_answers += 1
-                current_result.save()
+                answer = form.cleaned_data['answer']
+                attempt = TestAttempt(pk=quiz.attempt_id)
+                answer_key = AnswerKey.for_test(pk_test)
+                attempt.record_answer(question.id, answer, answer_key.grade(question.id, answer))
 
-                if count_questions < len([x for x in Question.objects.filter(test_id=pk_test)])-1:
+                if not quiz.is_last(count_questions):
                     count_questions += 1
                     return redirect('display question', pk_test=pk_test, count_questions=count_questions)
-                else:
-                    return redirect('final score', pk_test=pk_test)
+                elif not attempt.finish():
+                    unanswered = quiz.first_unanswered(set(
+                        AnswerRecord.objects.filter(attempt_id=attempt.pk).values_list('question_id', flat=True)))
+                    if unanswered is not None:
+                        return redirect('display question', pk_test=pk_test, count_questions=unanswered)
+                quiz.finish()
+                return redirect('final score', pk_test=pk_test, pk_attempt=attempt.pk)
         else:
-            form = QuestionForm()
+            form = AnswerQuestionForm(question)
 
         context = {
             'form': form,
@@ -112,26 +161,94 @@ def display_question(request, pk_test, count_questions):
         return render(request, 'main/display_question.html', context)
 
 
-def final_score(request, pk_test):
-    current_result = CurrentResult.objects.get(user_id=request.user.id)
-    total_answers = current_result.correct_answers + current_result.incorrect_answers
-    correct_answers = current_result.correct_answers
-    incorrect_answers = current_result.incorrect_answers
-    percentage = int(correct_answers/total_answers*100)
+@login_required
+def display_test(request, pk_test):
+    test = get_quiz_test_or_404(pk_test)
+    if request.method == 'POST':
+        quiz = QuizSession.load_form(request.session, pk_test, request.POST.get('quiz_form'))
+        if quiz is None:
+            return redirect('display test', pk_test=pk_test)
+    else:
+        quiz = QuizSession.start_form(request.session, test)
+    steps = [quiz.step(index) for index in range(len(quiz))]
+
+    if request.method == 'POST':
+        formset = AnswerQuestionFormSet(steps, request.POST)
+        if formset.is_valid():
+            answer_key = AnswerKey.for_test(pk_test)
+            answers = [(form.cleaned_data['question'], form.cleaned_data['answer']) for form in formset
+                       if answer_key.correct_answer(form.cleaned_data['question']) is not None]
+            attempt = TestAttempt.create_graded(
+                request.user,
+                pk_test,
+                [question_id for question_id, _ in answers],
+                [answer for _, answer in answers],
+                answer_key,
+                quiz.seed,
+            )
+            quiz.finish_form()
+            return redirect('final score', pk_test=pk_test, pk_attempt=attempt.pk)
+    else:
+        formset = AnswerQuestionFormSet(steps)
+
     context = {
-        'correct_answers': correct_answers,
-        'incorrect_answers': incorrect_answers,
-        'total_answers': total_answers,
-        'percentage': percentage,
+        'formset': formset,
+        'pk_test': pk_test,
+        'quiz_form': quiz.form_token,
+        'no_question': not steps,
+    }
+
+    return render(request, 'main/display_test.html', context)
+
+
+@login_required
+def final_score(request, pk_test, pk_attempt):
+    attempt = get_object_or_404(TestAttempt, pk=pk_attempt, test_id=pk_test, user_id=request.user.id)
+    context = {
+        'correct_answers': attempt.correct_answers,
+        'incorrect_answers': attempt.incorrect_answers,
+        'total_questions': attempt.question_total,
+        'percentage': attempt.percentage if attempt.score is None else attempt.score,
+        'summary': TestScoreSummary.objects.filter(test_id=pk_test).first(),
         'pk_test': pk_test
     }
-    current_result.correct_answers = 0
-    current_result.incorrect_answers = 0
-    current_result.save()
 
     return render(request, 'main/final_score.html', context)
 
 
+@login_required
+def test_leaderboard(request, pk_test):
+    test = get_object_or_404(Test.objects.only('id', 'title'), pk=pk_test)
+    context = {
+        'test': test,
+        'summary': TestScoreSummary.objects.filter(test_id=test.id).first(),
+        'entries': leaderboard(test.id),
+    }
+
+    return render(request, 'main/leaderboard.html', context)
+
+
+@login_required
+def search_results(request):
+    query = request.GET.get('q', '').strip()[:settings.SEARCH_QUERY_MAX_LENGTH]
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    per_page = settings.SEARCH_RESULTS_PER_PAGE
+    results = search(query, (page - 1) * per_page, per_page + 1) if query else []
+    context = {
+        'query': query,
+        'results': results[:per_page],
+        'page': page,
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if len(results) > per_page else None,
+    }
+
+    return render(request, 'main/search_results.html', context)
+
+
 class CreateCourseView(auth_mixin.LoginRequiredMixin, views.CreateView):
     template_name = 'main/course_create.html'
     form_class = CreateCourseForm
@@ -143,203 +260,307 @@ class CreateCourseView(auth_mixin.LoginRequiredMixin, views.CreateView):
         return kwargs
 
 
-class UserCoursesListView(ListView):
+class UserCoursesListView(FieldProjectionMixin, KeysetPaginationMixin, ListView):
     model = Course
+    only_fields = ('id', 'title', 'picture')
     template_name = 'main/list_user_courses.html'
     context_object_name = 'courses_list'
 
     def get_queryset(self):
         user = self.request.user.id
-        return Course.objects.filter(user_id=user)
+        return super().get_queryset().filter(user_id=user)
+
+
+class CourseOwnerMixin(OwnerRequiredMixin):
+    owned_model = Course
+    owned_object_context_name = 'course'
+
+
+class TestOwnerMixin(OwnerRequiredMixin):
+    owned_model = Test
+    owned_object_select_related = ('course',)
+    owned_object_context_name = 'test'
+    owner_id_path = 'course.user_id'
+
+
+class QuestionOwnerMixin(OwnerRequiredMixin):
+    owned_model = Question
+    owned_object_select_related = ('test__course',)
+    owned_object_context_name = 'question'
+    owner_id_path = 'test.course.user_id'
 
 
-class CourseEditView(views.UpdateView):
+class CourseEditView(CourseOwnerMixin, views.UpdateView):
     model = Course
     template_name = 'main/course_edit.html'
     form_class = CourseEditForm
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update({
-            'is_owner': self.object.user_id == self.request.user.id,
-        })
-        return context
-
     def get_success_url(self):
         return reverse_lazy('user list courses')
 
 
-class CourseDeleteView(views.DeleteView):
+class CourseDeleteView(CourseOwnerMixin, views.DeleteView):
     model = Course
     template_name = 'main/course_delete.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update({
-            'is_owner': self.object.user_id == self.request.user.id,
-        })
-        return context
-
     def get_success_url(self):
         return reverse_lazy('user list courses')
 
 
-class UserTestsListView(ListView):
+class CloneCourseView(CourseOwnerMixin, views.View):
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        clone = clone_course(self.get_owned_object(), request.user)
+        return redirect('edit course', pk=clone.pk)
+
+
+class ExportCourseView(CourseOwnerMixin, views.View):
+    def get(self, request, *args, **kwargs):
+        if not self.is_owner:
+            raise PermissionDenied
+        course = self.get_owned_object()
+        archive = tempfile.TemporaryFile()
+        export_course(course, archive, include_media=request.GET.get('media') != '0')
+        archive.seek(0)
+        return FileResponse(archive, as_attachment=True, filename=f'course_{course.pk}.zip',
+                            content_type='application/zip')
+
+
+class ImportCourseView(auth_mixin.LoginRequiredMixin, views.FormView):
+    template_name = 'main/course_import.html'
+    form_class = ImportCourseForm
+    success_url = reverse_lazy('user list courses')
+
+    def form_valid(self, form):
+        try:
+            import_course(form.cleaned_data['archive'], self.request.user, form.cleaned_data['category'])
+        except ArchiveError as error:
+            form.add_error('archive', str(error))
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+
+class UserTestsListView(CourseOwnerMixin, FieldProjectionMixin, KeysetPaginationMixin, ListView):
     model = Test
+    only_fields = ('id', 'title')
     template_name = 'main/list_user_tests.html'
     context_object_name = 'tests_list'
 
     def get_queryset(self):
-        course = get_object_or_404(Course, id=self.kwargs['pk'])
-        return Test.objects.filter(course_id=course.id)
+        return super().get_queryset().filter(course_id=self.get_owned_object().id)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        course = get_object_or_404(Course, id=self.kwargs['pk'])
-        context['course'] = course
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
 
-
-class CreateTestView(auth_mixin.LoginRequiredMixin, views.CreateView):
+class CreateTestView(auth_mixin.LoginRequiredMixin, CourseOwnerMixin, views.CreateView):
     form_class = CreateTestForm
     template_name = 'main/test_create.html'
 
     def get_success_url(self):
-        course = self.get_context_data()['course']
-        course_id = course.id
-        return reverse_lazy('user list tests', kwargs={'pk': course_id})
+        return reverse_lazy('user list tests', kwargs={'pk': self.get_owned_object().id})
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs['course_id'] = self.kwargs['pk']
+        kwargs['course_id'] = self.get_owned_object().id
         return kwargs
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        course = get_object_or_404(Course, id=self.kwargs['pk'])
-        context['course'] = course
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
-
 
-class EditTestView(views.UpdateView):
+class EditTestView(TestOwnerMixin, views.UpdateView):
     model = Test
     template_name = 'main/test_edit.html'
     form_class = EditTestForm
 
     def get_success_url(self):
-        test = self.get_context_data()['test']
-        return reverse_lazy('user list tests', kwargs={'pk': test.course_id})
+        return reverse_lazy('user list tests', kwargs={'pk': self.get_owned_object().course_id})
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        test = get_object_or_404(Test, id=self.kwargs['pk'])
-        course_id = test.course_id
-        course = Course.objects.get(pk=course_id)
-        context['test'] = test
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
 
-
-class DeleteTestView(views.DeleteView):
+class DeleteTestView(TestOwnerMixin, views.DeleteView):
     model = Test
     template_name = 'main/test_delete.html'
 
     def get_success_url(self):
-        test = self.get_context_data()['test']
-        return reverse_lazy('user list tests', kwargs={'pk': test.course_id})
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        test = get_object_or_404(Test, id=self.kwargs['pk'])
-        course_id = test.course_id
-        course = Course.objects.get(pk=course_id)
-        context['test'] = test
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
+        return reverse_lazy('user list tests', kwargs={'pk': self.get_owned_object().course_id})
 
 
-class UserQuestionsListView(ListView):
+class UserQuestionsListView(TestOwnerMixin, FieldProjectionMixin, KeysetPaginationMixin, ListView):
     model = Question
+    only_fields = ('id', 'title', 'position', 'correct_answer', 'statistics__response_count', 'statistics__p_value',
+                   'statistics__discrimination', *(f'statistics__{x}' for x in QuestionStatistics.OPTION_RATE_FIELDS))
+    keyset_field = 'position'
     template_name = 'main/list_user_questions.html'
     context_object_name = 'questions_list'
 
     def get_queryset(self):
-        test = get_object_or_404(Test, id=self.kwargs['pk'])
-        return Question.objects.filter(test_id=test.id)
+        return super().get_queryset().select_related('statistics').filter(test_id=self.get_owned_object().id)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        test = get_object_or_404(Test, id=self.kwargs['pk'])
-        course_id = test.course_id
-        course = Course.objects.get(pk=course_id)
-        context['test'] = test
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
 
-
-class CreateQuestionView(auth_mixin.LoginRequiredMixin, views.CreateView):
+class CreateQuestionView(auth_mixin.LoginRequiredMixin, TestOwnerMixin, views.CreateView):
     form_class = CreateQuestionForm
     template_name = 'main/question_create.html'
 
     def get_success_url(self):
-        test = self.get_context_data()['test']
-        test_id = test.id
-        return reverse_lazy('user list questions', kwargs={'pk': test_id})
+        return reverse_lazy('user list questions', kwargs={'pk': self.get_owned_object().id})
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs['test_id'] = self.kwargs['pk']
+        kwargs['test_id'] = self.get_owned_object().id
         return kwargs
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        test = get_object_or_404(Test, id=self.kwargs['pk'])
-        course_id = test.course_id
-        course = Course.objects.get(pk=course_id)
-        context['test'] = test
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
-
 
-class DeleteQuestionView(views.DeleteView):
+class DeleteQuestionView(QuestionOwnerMixin, views.DeleteView):
     model = Question
     template_name = 'main/question_delete.html'
 
     def get_success_url(self):
-        question = self.get_context_data()['question']
-        test_id = question.test_id
-        return reverse_lazy('user list questions', kwargs={'pk': test_id})
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        question = get_object_or_404(Question, id=self.kwargs['pk'])
-        test = Test.objects.get(pk=question.test_id)
-        course = Course.objects.get(pk=test.course_id)
-        context['question'] = question
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
-
-
-class EditQuestionView(views.UpdateView):
+        return reverse_lazy('user list questions', kwargs={'pk': self.get_owned_object().test_id})
+
+
+class ReorderQuestionsView(TestOwnerMixin, views.View):
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        test = self.get_owned_object()
+        try:
+            if 'order' in request.POST:
+                question_ids = [int(x) for x in request.POST.getlist('order')]
+            else:
+                question_ids = self.move(test.id, int(request.POST['question']), int(request.POST['offset']))
+            Question.reorder(test.id, question_ids)
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest()
+
+        return redirect('user list questions', pk=test.id)
+
+    @staticmethod
+    def move(test_id, question_id, offset):
+        question_ids = list(Question.objects.filter(test_id=test_id).order_by('position').values_list('id', flat=True))
+        index = question_ids.index(question_id)
+        target = min(max(index + offset, 0), len(question_ids) - 1)
+        question_ids.insert(target, question_ids.pop(index))
+        return question_ids
+
+
+class ImportQuestionsView(TestOwnerMixin, views.View):
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return JsonResponse({'errors': ['A question bank file is required']}, status=400)
+        try:
+            file_format = question_bank.guess_format(request.POST.get('format') or upload.name)
+        except ValueError as error:
+            return JsonResponse({'errors': [str(error)]}, status=400)
+
+        rows = question_bank.read_rows(upload.file, file_format)
+        result = question_bank.import_questions(self.get_owned_object().id, rows)
+        return JsonResponse(result.as_dict(), status=201 if result.created else 400)
+
+
+class ExportQuestionsView(TestOwnerMixin, views.View):
+    def get(self, request, *args, **kwargs):
+        if not self.is_owner:
+            raise PermissionDenied
+        file_format = self.kwargs['file_format']
+        if file_format not in question_bank.FORMATS:
+            raise Http404
+
+        test = self.get_owned_object()
+        response = StreamingHttpResponse(
+            question_bank.export_questions(test.id, file_format),
+            content_type=question_bank.CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="test_{test.id}_questions.{file_format}"'
+        return response
+
+
+class EditQuestionView(QuestionOwnerMixin, views.UpdateView):
     model = Question
     template_name = 'main/question_edit.html'
     form_class = EditQuestionForm
 
     def get_success_url(self):
-        question = self.get_context_data()['question']
-        test_id = question.test_id
-        return reverse_lazy('user list questions', kwargs={'pk': test_id})
+        return reverse_lazy('user list questions', kwargs={'pk': self.get_owned_object().test_id})
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        question = get_object_or_404(Question, id=self.kwargs['pk'])
-        test = Test.objects.get(pk=question.test_id)
-        course = Course.objects.get(pk=test.course_id)
-        context['question'] = question
-        context['is_owner'] = course.user_id == self.request.user.id
-        return context
+
+def get_document_preview_or_404(pk, number):
+    course = get_object_or_404(Course.objects.only('id', 'title', 'document'), pk=pk)
+    preview = get_object_or_404(DocumentPreview, document=course.document.name)
+    if not 1 <= number <= preview.page_count:
+        raise Http404
+    return course, preview
+
+
+@login_required
+def document_preview(request, pk, number):
+    course, preview = get_document_preview_or_404(pk, number)
+    page = get_object_or_404(DocumentPage, preview=preview, number=number)
+    context = {
+        'course': course,
+        'preview': preview,
+        'page': page,
+        'previous_page': number - 1 if number > 1 else None,
+        'next_page': number + 1 if number < preview.page_count else None,
+    }
+    return render(request, 'main/document_preview.html', context)
+
+
+@login_required
+@require_safe
+def document_page_image(request, pk, number):
+    course, _ = get_document_preview_or_404(pk, number)
+    return serve_file(request, get_page_image(course.document.name, number))
+
+
+@login_required
+@require_POST
+def create_upload(request, pk, field):
+    course = get_object_or_404(Course.objects.only('id', 'user_id'), pk=pk)
+    if course.user_id != request.user.id:
+        raise PermissionDenied
+
+    filename = request.POST.get('filename', '')
+    try:
+        size = int(request.POST.get('size', ''))
+        validate_upload(field, filename, size)
+    except ValueError:
+        return JsonResponse({'errors': ['Invalid file size']}, status=400)
+    except ValidationError as error:
+        return JsonResponse({'errors': error.messages}, status=400)
+
+    upload_session = UploadSession.objects.create(course=course, field=field, filename=filename, size=size)
+    return JsonResponse({
+        'url': reverse('upload chunk', kwargs={'pk': upload_session.pk}),
+        'received': upload_session.received,
+    }, status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'PUT'])
+def upload_chunk(request, pk):
+    upload_session = get_object_or_404(
+        UploadSession.objects.select_related('course'),
+        pk=pk,
+        course__user_id=request.user.id,
+        created_at__gte=expiry_cutoff(),
+    )
+
+    if request.method == 'PUT' and not upload_session.is_complete:
+        try:
+            start, length = parse_content_range(request.headers.get('Content-Range'), upload_session.size)
+            write_chunk(upload_session, start, request, length)
+        except ValidationError as error:
+            if upload_session.received == 0:
+                discard(upload_session)
+            return JsonResponse({'errors': error.messages}, status=400)
+
+        if upload_session.received == upload_session.size:
+            finalize(upload_session)
+
+    return JsonResponse({
+        'received': upload_session.received,
+        'size': upload_session.size,
+        'is_complete': upload_session.is_complete,
+    })
 
 
 class QuestionDetailView(DetailView):
@@ -44,10 +44,12 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'gain_knowledge.main',
-    'gain_knowledge.accounts'
+    'gain_knowledge.accounts',
+    'gain_knowledge.jobs',
 ]
 
 MIDDLEWARE = [
+    'gain_knowledge.common.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +60,10 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', str(DEBUG)) == 'True'
+
+INSTRUMENTATION_WINDOW_SIZE = 1000
+
 
 ROOT_URLCONF = 'gain_knowledge.urls'
 
@@ -96,6 +102,54 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHE_BACKENDS = {
+    'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'filebased')],
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache/')),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+
+# Search
+
+SEARCH_RESULTS_PER_PAGE = 20
+
+SEARCH_QUERY_MAX_LENGTH = 200
+
+
+# Scores
+
+LEADERBOARD_SIZE = 10
+
+
+# Background jobs
+# Job handlers write into MEDIA_ROOT and bump versions in the default cache. Both live on the local filesystem,
+# so the runner must share a dyno with the web process (see Procfile). A separate worker dyno would first need
+# shared file storage and a shared cache backend.
+
+JOBS_WORKER_PROCESSES = int(os.environ.get('JOBS_WORKER_PROCESSES', 2))
+
+JOBS_POLL_INTERVAL_SECONDS = 2
+
+JOBS_MAX_ATTEMPTS = 5
+
+JOBS_BACKOFF_SECONDS = 30
+
+JOBS_TIMEOUT_SECONDS = 30 * 60
+
+JOBS_HEARTBEAT_SECONDS = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -142,6 +196,40 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 MEDIA_URL = '/media/'
 
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+DEFAULT_FILE_STORAGE = 'gain_knowledge.common.storage.ContentAddressedStorage'
+
+FILE_UPLOAD_HANDLERS = [
+    'gain_knowledge.common.upload_handlers.MaxSizeUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+FILE_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+
+CHUNKED_UPLOAD_TEMP_DIR = 'uploads'
+
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 10 * 1024 * 1024
+
+CHUNKED_UPLOAD_EXPIRY_SECONDS = 24 * 60 * 60
+
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', 'ffprobe')
+
+VIDEO_DEFAULT_HEIGHT = 720
+
+PDFINFO_BINARY = os.environ.get('PDFINFO_BINARY', 'pdfinfo')
+
+PDFTOTEXT_BINARY = os.environ.get('PDFTOTEXT_BINARY', 'pdftotext')
+
+PDFTOPPM_BINARY = os.environ.get('PDFTOPPM_BINARY', 'pdftoppm')
+
+DOCUMENT_PAGE_CACHE_LOCATION = os.environ.get('DOCUMENT_PAGE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache/pages/'))
+
+DOCUMENT_PAGE_CACHE_MAX_SIZE = int(os.environ.get('DOCUMENT_PAGE_CACHE_MAX_SIZE', 512 * 1024 * 1024))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
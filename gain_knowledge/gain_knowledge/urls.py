@@ -14,13 +14,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.urls import path, include, re_path
 from django.conf import settings
 
+from gain_knowledge.common.instrumentation import instrumentation_stats
+from gain_knowledge.common.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('instrumentation/', instrumentation_stats, name='instrumentation stats'),
     path('', include('gain_knowledge.main.urls')),
-    path('accounts/', include('gain_knowledge.accounts.urls'))
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('accounts/', include('gain_knowledge.accounts.urls')),
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve_media, name='serve media'),
+]
 
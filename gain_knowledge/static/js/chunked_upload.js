@@ -0,0 +1,59 @@
+(function () {
+    const CHUNK_SIZE = 5 * 1024 * 1024;
+    const container = document.getElementById('chunked-upload');
+    if (!container) {
+        return;
+    }
+
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+    const fieldSelect = container.querySelector('select');
+    const fileInput = container.querySelector('input[type=file]');
+    const progress = container.querySelector('progress');
+    const status = container.querySelector('.upload-status');
+
+    async function sendChunks(url, file, received) {
+        while (received < file.size) {
+            const end = Math.min(received + CHUNK_SIZE, file.size);
+            const response = await fetch(url, {
+                method: 'PUT',
+                headers: {
+                    'X-CSRFToken': csrfToken,
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Range': `bytes ${received}-${end - 1}/${file.size}`,
+                },
+                body: file.slice(received, end),
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.errors.join(' '));
+            }
+            received = result.received;
+            progress.value = received / file.size;
+        }
+    }
+
+    container.querySelector('button').addEventListener('click', async function () {
+        const file = fileInput.files[0];
+        if (!file) {
+            return;
+        }
+        const body = new FormData();
+        body.append('filename', file.name);
+        body.append('size', file.size);
+        try {
+            const response = await fetch(container.dataset[`${fieldSelect.value}Url`], {
+                method: 'POST',
+                headers: {'X-CSRFToken': csrfToken},
+                body: body,
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.errors.join(' '));
+            }
+            await sendChunks(result.url, file, result.received);
+            status.textContent = 'Upload complete';
+        } catch (error) {
+            status.textContent = error.message;
+        }
+    });
+})();